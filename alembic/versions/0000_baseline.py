@@ -0,0 +1,31 @@
+"""baseline
+
+Root of the main migration chain. The tables that existed before Alembic
+was introduced are created by Base.metadata.create_all, so there is
+nothing to do here. The pgvector tables live on their own branch so that
+deployments without the extension can still apply every later revision.
+
+Run ``alembic upgrade main@head`` everywhere, and additionally
+``alembic upgrade pgvector@head`` when VECTOR_INDEX_BACKEND=pgvector.
+
+Revision ID: 0000_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0000_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = ('main',)
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
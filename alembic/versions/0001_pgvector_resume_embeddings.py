@@ -0,0 +1,94 @@
+"""pgvector resume embeddings
+
+Moves resume embeddings into a vector(384) column with an HNSW index so
+nlp_search can rank in SQL. Existing rows are backfilled from both the
+JSONB float list format and the legacy raw float32 bytes format.
+
+This is the root of the "pgvector" branch, apply it with
+``alembic upgrade pgvector@head`` only where the extension is available.
+
+Revision ID: 0001_pgvector
+Revises:
+Depends on: 0000_baseline
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_pgvector'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = ('pgvector',)
+depends_on: Union[str, Sequence[str], None] = '0000_baseline'
+
+BATCH_SIZE = 1000
+EMBEDDING_DIM = 384
+
+
+def _to_vector(embedding) -> np.ndarray:
+    # Same decoding as app.utils.embedding.to_vector, inlined so the migration needs no app imports
+    if isinstance(embedding, str):
+        embedding = json.loads(embedding)
+    if isinstance(embedding, list):
+        return np.array(embedding, dtype=np.float32)
+    embedding = bytes(embedding)
+    if len(embedding) == EMBEDDING_DIM * 2:
+        return np.frombuffer(embedding, dtype=np.float16).astype(np.float32)
+    if len(embedding) == EMBEDDING_DIM + 4:
+        scale = np.frombuffer(embedding, dtype=np.float32, count=1)[0]
+        return np.frombuffer(embedding, dtype=np.int8, offset=4).astype(np.float32) * scale
+    return np.frombuffer(embedding, dtype=np.float32)
+
+
+def _to_pgvector_literal(embedding) -> str:
+    vector = _to_vector(embedding)
+    return "[" + ",".join(repr(float(x)) for x in vector) + "]"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resume_embeddings (
+            resume_id INTEGER PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+            embedding vector(384) NOT NULL
+        )
+        """
+    )
+
+    # Decode in Python so JSONB lists and every packed bytea format are handled
+    bind = op.get_bind()
+    insert = sa.text(
+        "INSERT INTO resume_embeddings (resume_id, embedding) "
+        "VALUES (:resume_id, CAST(:embedding AS vector)) "
+        "ON CONFLICT (resume_id) DO UPDATE SET embedding = EXCLUDED.embedding"
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, embedding FROM resumes "
+                "WHERE embedding IS NOT NULL AND id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(insert, [{"resume_id": row.id, "embedding": _to_pgvector_literal(row.embedding)} for row in rows])
+        last_id = rows[-1].id
+
+    # Build the graph after the bulk load, it is much faster than incremental inserts
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_resume_embeddings_hnsw ON resume_embeddings "
+        "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS resume_embeddings")
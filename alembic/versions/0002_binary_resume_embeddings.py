@@ -0,0 +1,119 @@
+"""binary resume embeddings
+
+Converts resumes.embedding from a JSONB float list to packed bytes in the
+format configured by EMBEDDING_STORAGE_DTYPE. Databases where the column
+already holds legacy raw float32 bytes are left as they are, since those
+rows are still readable.
+
+Required before running this version: the model maps the column as
+bytes, so inserts fail while it is still JSONB.
+
+Revision ID: 0002_binary_embeddings
+Revises: 0000_baseline
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_binary_embeddings'
+down_revision: Union[str, None] = '0000_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+EMBEDDING_DIM = 384
+
+
+# Pack and unpack are inlined from app.utils.embedding, importing it would
+# load the embedding model just to run a migration
+def _encode(embedding, dtype: str) -> bytes:
+    vector = np.asarray(embedding, dtype=np.float32)
+    if dtype == "float32":
+        return vector.tobytes()
+    if dtype == "float16":
+        return vector.astype(np.float16).tobytes()
+    if dtype == "int8":
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        return np.float32(scale).tobytes() + quantized.tobytes()
+    raise ValueError(f"Unknown embedding storage dtype: {dtype}")
+
+
+def _decode(embedding: bytes) -> np.ndarray:
+    if len(embedding) == EMBEDDING_DIM * 2:
+        return np.frombuffer(embedding, dtype=np.float16).astype(np.float32)
+    if len(embedding) == EMBEDDING_DIM + 4:
+        scale = np.frombuffer(embedding, dtype=np.float32, count=1)[0]
+        return np.frombuffer(embedding, dtype=np.int8, offset=4).astype(np.float32) * scale
+    return np.frombuffer(embedding, dtype=np.float32)
+
+
+def _column_type(bind) -> str:
+    return bind.execute(
+        sa.text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'resumes' AND column_name = 'embedding'"
+        )
+    ).scalar()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if _column_type(bind) != "jsonb":
+        return
+
+    op.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS embedding_bin BYTEA")
+    update = sa.text("UPDATE resumes SET embedding_bin = :embedding WHERE id = :id")
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, embedding FROM resumes "
+                "WHERE embedding IS NOT NULL AND id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            update,
+            [{"id": row.id, "embedding": _encode(row.embedding, settings.EMBEDDING_STORAGE_DTYPE)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.execute("ALTER TABLE resumes DROP COLUMN embedding")
+    op.execute("ALTER TABLE resumes RENAME COLUMN embedding_bin TO embedding")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS embedding_json JSONB")
+    update = sa.text("UPDATE resumes SET embedding_json = CAST(:embedding AS JSONB) WHERE id = :id")
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, embedding FROM resumes "
+                "WHERE embedding IS NOT NULL AND id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            update,
+            [{"id": row.id, "embedding": json.dumps(_decode(bytes(row.embedding)).tolist())} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.execute("ALTER TABLE resumes DROP COLUMN embedding")
+    op.execute("ALTER TABLE resumes RENAME COLUMN embedding_json TO embedding")
@@ -0,0 +1,32 @@
+"""resume file claims
+
+Records which worker claimed a resume file and when, and indexes status
+so SELECT ... FOR UPDATE SKIP LOCKED claims stay cheap.
+
+Revision ID: 0003_resume_file_claims
+Revises: 0002_binary_embeddings
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_resume_file_claims'
+down_revision: Union[str, None] = '0002_binary_embeddings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE resume_files ADD COLUMN IF NOT EXISTS worker_id VARCHAR")
+    op.execute("ALTER TABLE resume_files ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP WITH TIME ZONE")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_resume_files_status ON resume_files (status)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_resume_files_status")
+    op.execute("ALTER TABLE resume_files DROP COLUMN IF EXISTS claimed_at")
+    op.execute("ALTER TABLE resume_files DROP COLUMN IF EXISTS worker_id")
@@ -0,0 +1,30 @@
+"""resume file leases
+
+Adds a lease expiry and attempt counter to resume files so files left in
+"processing" by a crashed worker can be returned to the queue.
+
+Revision ID: 0004_resume_file_leases
+Revises: 0003_resume_file_claims
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_resume_file_leases'
+down_revision: Union[str, None] = '0003_resume_file_claims'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE resume_files ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITH TIME ZONE")
+    op.execute("ALTER TABLE resume_files ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE resume_files DROP COLUMN IF EXISTS attempts")
+    op.execute("ALTER TABLE resume_files DROP COLUMN IF EXISTS lease_expires_at")
@@ -0,0 +1,41 @@
+"""resume content hash and parse cache
+
+Records a SHA-256 of each uploaded file and caches the parsed resume and
+embedding per hash, so byte-identical uploads skip the LLM and the model.
+
+Revision ID: 0005_resume_content_hash
+Revises: 0004_resume_file_leases
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_resume_content_hash'
+down_revision: Union[str, None] = '0004_resume_file_leases'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE resume_files ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_resume_files_content_hash ON resume_files (content_hash)")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS parsed_resume_cache (
+            content_hash VARCHAR(64) PRIMARY KEY,
+            parsed JSONB NOT NULL,
+            embedding BYTEA NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS parsed_resume_cache")
+    op.execute("DROP INDEX IF EXISTS ix_resume_files_content_hash")
+    op.execute("ALTER TABLE resume_files DROP COLUMN IF EXISTS content_hash")
@@ -0,0 +1,30 @@
+"""resume filter indexes
+
+A btree on total_experience for the nlp-search ``min_experience`` filter.
+The skill columns get no index: their filters run against the in-memory
+skill index, or as ``?|`` predicates inside the pgvector scan, which a
+jsonb_path_ops GIN index cannot serve.
+
+Revision ID: 0006_resume_filter_indexes
+Revises: 0005_resume_content_hash
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_resume_filter_indexes'
+down_revision: Union[str, None] = '0005_resume_content_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_resumes_total_experience ON resumes (total_experience)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_resumes_total_experience")
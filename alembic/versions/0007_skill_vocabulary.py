@@ -0,0 +1,47 @@
+"""skill vocabulary
+
+Adds the canonical ``skills`` table and the ``skill_aliases`` table used to
+map free-text skills onto it. Skill filters in nlp-search run against an
+in-memory bitset index of canonical skills.
+
+Revision ID: 0007_skill_vocabulary
+Revises: 0006_resume_filter_indexes
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_skill_vocabulary'
+down_revision: Union[str, None] = '0006_resume_filter_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS skills (
+            id SERIAL PRIMARY KEY,
+            key VARCHAR NOT NULL UNIQUE,
+            name VARCHAR NOT NULL
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_skills_id ON skills (id)")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS skill_aliases (
+            alias VARCHAR PRIMARY KEY,
+            skill_id INTEGER NOT NULL REFERENCES skills (id) ON DELETE CASCADE
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS skill_aliases")
+    op.execute("DROP TABLE IF EXISTS skills")
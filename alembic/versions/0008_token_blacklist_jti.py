@@ -0,0 +1,38 @@
+"""token blacklist jti
+
+Revocations are keyed on the token's ``jti`` claim and carry the token's
+expiry so expired entries can be purged. ``token`` is kept, now nullable,
+for tokens issued before jti was added.
+
+Revision ID: 0008_token_blacklist_jti
+Revises: 0007_skill_vocabulary
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_token_blacklist_jti'
+down_revision: Union[str, None] = '0007_skill_vocabulary'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE token_blacklist ADD COLUMN IF NOT EXISTS jti VARCHAR(64)")
+    op.execute("ALTER TABLE token_blacklist ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITH TIME ZONE")
+    op.execute("ALTER TABLE token_blacklist ALTER COLUMN token DROP NOT NULL")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_token_blacklist_jti ON token_blacklist (jti)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_token_blacklist_expires_at ON token_blacklist (expires_at)")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM token_blacklist WHERE token IS NULL")
+    op.execute("DROP INDEX IF EXISTS ix_token_blacklist_expires_at")
+    op.execute("DROP INDEX IF EXISTS ix_token_blacklist_jti")
+    op.execute("ALTER TABLE token_blacklist ALTER COLUMN token SET NOT NULL")
+    op.execute("ALTER TABLE token_blacklist DROP COLUMN IF EXISTS expires_at")
+    op.execute("ALTER TABLE token_blacklist DROP COLUMN IF EXISTS jti")
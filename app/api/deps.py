@@ -5,7 +5,7 @@ from app.core.database import get_db
 from app.core.security import verify_token
 from app.services.user_service import UserService
 from app.services.auth_service import AuthService
-from app.models.user import User
+from app.schemas.user import CurrentUser
 from typing import Optional
 
 security = HTTPBearer()
@@ -14,23 +14,23 @@ security = HTTPBearer()
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> CurrentUser:
     token = credentials.credentials
     
-    # Check if token is blacklisted
-    if AuthService.is_token_blacklisted(db, token):
+    # Verify token
+    payload = verify_token(token)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked",
+            detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify token
-    payload = verify_token(token)
-    if payload is None:
+    # Check if token is blacklisted
+    if AuthService.is_token_blacklisted(db, token, payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
@@ -42,7 +42,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = UserService.get_user_by_email(db, email)
+    user = UserService.get_current_user(db, email)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
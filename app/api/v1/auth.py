@@ -5,14 +5,14 @@ from app.schemas.auth import UserSignup, UserLogin, Token, LogoutResponse
 from app.schemas.user import UserResponse, HROnboardingCreate, HROnboardingResponse, UserOnboardingCreate, UserOnboardingResponse
 from app.services.auth_service import AuthService
 from app.api.deps import get_current_user, get_current_token
-from app.models.user import User
+from app.schemas.user import CurrentUser
 from app.services.user_service import HROnboardingService, UserOnboardingService
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/signup", response_model=dict)
-def signup(
+async def signup(
     user_data: UserSignup,
     db: Session = Depends(get_db)
 ):
@@ -20,7 +20,7 @@ def signup(
     Create a new user account
     """
     try:
-        result = AuthService.signup(db, user_data)
+        result = await AuthService.signup(db, user_data)
         return {
             "message": "User created successfully",
             "user": UserResponse.model_validate(result["user"]),
@@ -36,7 +36,7 @@ def signup(
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     user_data: UserLogin,
     db: Session = Depends(get_db)
 ):
@@ -44,7 +44,7 @@ def login(
     Login user and return access token
     """
     try:
-        return AuthService.login(db, user_data)
+        return await AuthService.login(db, user_data)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -56,7 +56,7 @@ def login(
 
 @router.post("/logout", response_model=LogoutResponse)
 def logout(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     token: str = Depends(get_current_token),
     db: Session = Depends(get_db)
 ):
@@ -74,7 +74,7 @@ def logout(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: CurrentUser = Depends(get_current_user)):
     """
     Get current user information
     """
@@ -85,7 +85,7 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
 def create_hr_onboarding(
     onboarding_data: HROnboardingCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.role != "hr":
         raise HTTPException(status_code=403, detail="Not authorized: HR only")
@@ -96,7 +96,7 @@ def create_hr_onboarding(
 @router.get("/hr-onboarding", response_model=HROnboardingResponse)
 def get_hr_onboarding(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.role != "hr":
         raise HTTPException(status_code=403, detail="Not authorized: HR only")
@@ -110,7 +110,7 @@ def get_hr_onboarding(
 def create_user_onboarding(
     onboarding_data: UserOnboardingCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     onboarding = UserOnboardingService.create_onboarding(db, current_user.id, onboarding_data)
     return onboarding
@@ -119,7 +119,7 @@ def create_user_onboarding(
 @router.get("/user-onboarding", response_model=UserOnboardingResponse)
 def get_user_onboarding(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     onboarding = UserOnboardingService.get_onboarding_by_user_id(db, current_user.id)
     if not onboarding:
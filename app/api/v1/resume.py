@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, UploadFile, File, Body
-from typing import Annotated
-from app.schemas.resume import ResumeParse
-from app.services.resume_service import ResumeService
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, UploadFile, File, Body, Request, Response
+from typing import Annotated, List, Optional
+from app.schemas.resume import ResumeParse, ResumeListResponse, ResumeDetailResponse, NlpSearchResponse, ResumeFileListResponse
+from app.services.resume_service import ResumeService, notify_resume_files_ready
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api.deps import get_current_user
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.schemas.user import CurrentUser
 from app.models.resume import ResumeFile, ResumeFileStatus, Resume
 import os
 from uuid import uuid4
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from app.services.user_service import HROnboardingService
 from app.core.config import settings
+from app.utils.upload import save_pdf_upload
+from app.utils.response_cache import etag_matches
 from groq import Groq
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
@@ -20,10 +23,10 @@ router = APIRouter(prefix="/resume", tags=["Resume"])
 async def parse_resume(
     resume: Annotated[ResumeParse, Form()],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ) -> dict:
     try:
-        result = ResumeService.parse_resume(db, resume.resumes, current_user.id)
+        result = await ResumeService.parse_resume(db, resume.resumes, current_user.id)
         return {
             "message": "Resume parsed successfully",
         }
@@ -40,56 +43,81 @@ async def parse_resume(
 async def batch_upload_resumes(
     resumes: list[UploadFile] = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     upload_dir = os.path.join("assets", "uploaded_resumes")
     os.makedirs(upload_dir, exist_ok=True)
     file_records = []
-    for file in resumes:
-        ext = os.path.splitext(file.filename)[1]
-        unique_name = f"{uuid4().hex}{ext}"
-        file_path = os.path.join(upload_dir, unique_name)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        resume_file = ResumeFile(
-            user_id=current_user.id,
-            file_path=file_path,
-            filename=file.filename,
-            status=ResumeFileStatus.pending
-        )
-        db.add(resume_file)
-        db.flush()  # get id
-        file_records.append({
-            "id": resume_file.id,
-            "file_path": file_path,
-            "filename": file.filename,
-            "status": resume_file.status
-        })
-    db.commit()
+    written = []
+    total_size = 0
+    try:
+        for file in resumes:
+            ext = os.path.splitext(file.filename)[1]
+            unique_name = f"{uuid4().hex}{ext}"
+            file_path = os.path.join(upload_dir, unique_name)
+            written.append(file_path)
+            size, content_hash = await save_pdf_upload(
+                file,
+                file_path,
+                max_bytes=min(settings.MAX_UPLOAD_FILE_BYTES, settings.MAX_UPLOAD_REQUEST_BYTES - total_size)
+            )
+            total_size += size
+            resume_file = ResumeFile(
+                user_id=current_user.id,
+                file_path=file_path,
+                filename=file.filename,
+                status=ResumeFileStatus.pending,
+                content_hash=content_hash
+            )
+            db.add(resume_file)
+            db.flush()  # get id
+            file_records.append({
+                "id": resume_file.id,
+                "file_path": file_path,
+                "filename": file.filename,
+                "status": resume_file.status
+            })
+        db.commit()
+    except BaseException:
+        # Nothing from a failed request is kept, whether it was rejected, hit a disk error or was cancelled
+        db.rollback()
+        for file_path in written:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        raise
+    notify_resume_files_ready(db)
     return {"files": file_records}
 
-@router.get("/public", response_model=dict)
-def get_public_resumes(db: Session = Depends(get_db)):
-    resumes = ResumeService.get_public_resumes(db)
-    return {"resumes": resumes}
+@router.get("/public", response_model=ResumeListResponse, response_class=ORJSONResponse)
+def get_public_resumes(
+    db: Session = Depends(get_db),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200)
+):
+    resumes, next_cursor = ResumeService.get_public_resumes(db, cursor, limit)
+    return {"resumes": resumes, "next_cursor": next_cursor}
 
-@router.get("/my-uploads", response_model=dict)
-def get_my_uploads(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/my-uploads", response_model=ResumeFileListResponse, response_class=ORJSONResponse)
+def get_my_uploads(db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_user)):
     files = db.query(ResumeFile).filter(ResumeFile.user_id == current_user.id).all()
-    return {"files": [
-        {"id": f.id, "file_path": f.file_path, "status": f.status, "user_id": f.user_id, "filename": f.filename} for f in files
-    ]}
+    return {"files": files}
 
-@router.post("/nlp-search", response_model=dict)
+@router.post("/nlp-search", response_model=NlpSearchResponse, response_class=ORJSONResponse)
 def nlp_search(
     db: Session = Depends(get_db),
-    english_query: str = Body(..., embed=True)
+    english_query: str = Body(..., embed=True),
+    min_experience: Optional[float] = Body(None, ge=0, description="Minimum total years of experience"),
+    skills: List[str] = Body([], description="Technical skills every result must list"),
+    languages: List[str] = Body([], description="Programming languages every result must list"),
+    any_skills: List[str] = Body(
+        [], description="Skills of which every result must list at least one, in its skills, languages or projects"
+    )
 ):
-    results = ResumeService.nlp_search(db, english_query)
+    results = ResumeService.nlp_search(db, english_query, min_experience, skills, languages, any_skills)
     return {"results": results}
 
-@router.get("/private", response_model=dict)
-def get_private_resumes(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/private", response_model=ResumeListResponse, response_class=ORJSONResponse)
+def get_private_resumes(db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_current_user)):
     resumes = ResumeService.get_resumes_by_user(db, current_user.id)
     return {"resumes": resumes}
 
@@ -97,19 +125,25 @@ def get_private_resumes(db: Session = Depends(get_db), current_user: User = Depe
 def generate_outreach_email(
     resume_id: int = Body(..., embed=True),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     email = ResumeService.generate_outreach_email(db, resume_id, current_user)
     return {"email": email}
 
-@router.get("/{resume_id}", response_model=dict)
-def get_resume_by_id(resume_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    resume, error = ResumeService.get_resume_by_id(db, resume_id, current_user)
+@router.get("/{resume_id}", response_model=ResumeDetailResponse, response_class=ORJSONResponse)
+def get_resume_by_id(
+    resume_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    entry, error = ResumeService.get_cached_resume(db, resume_id, current_user)
     if error == "Resume not found":
         raise HTTPException(status_code=404, detail=error)
-    if error == "Uploader not found":
-        raise HTTPException(status_code=404, detail=error)
     if error == "Not authorized to access this resume":
         raise HTTPException(status_code=403, detail=error)
-    return resume
-
+    etag, resume = entry
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ORJSONResponse(resume, headers=headers)
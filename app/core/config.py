@@ -7,11 +7,23 @@ ROOT_DIR = Path(__file__).parent.parent.parent
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # defaults to DATABASE_URL with the asyncpg driver
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 keeps connections open indefinitely
+    DB_POOL_PRE_PING: bool = True
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 30  # how stale a replica's view of logouts elsewhere may be
+    TOKEN_BLACKLIST_PURGE_SECONDS: int = 3600
+    BCRYPT_ROUNDS: int = 12  # existing hashes are upgraded to this cost on their next login
+    PASSWORD_HASH_WORKERS: int = 2
+    USER_CACHE_SIZE: int = 10000  # 0 disables the authenticated user cache
+    USER_CACHE_TTL_SECONDS: int = 60
     
     # App
     DEBUG: bool = False
@@ -19,6 +31,51 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
 
     GROQ_API_KEY: str
+
+    # Embeddings
+    EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "torch"  # "torch", "onnx" or "onnx-int8"
+    EMBEDDING_ONNX_DIR: str = str(Path(ROOT_DIR, "assets", "onnx_models"))
+    EMBEDDING_ONNX_QUANTIZATION: str = "avx2"  # "arm64", "avx2", "avx512" or "avx512_vnni"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 3600
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_WAIT_MS: float = 5
+    EMBEDDING_STORAGE_DTYPE: str = "float16"  # "float32", "float16" or "int8"
+
+    # Uploads
+    MAX_UPLOAD_FILE_BYTES: int = 10 * 1024 * 1024
+    MAX_UPLOAD_REQUEST_BYTES: int = 500 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+
+    # Background resume processing
+    RUN_RESUME_WORKER: bool = True  # set False on API nodes when dedicated workers run app.worker
+    WORKER_ID: str = ""  # defaults to hostname-pid
+    RESUME_PDF_WORKERS: int = 2
+    RESUME_LLM_CONCURRENCY: int = 4
+    RESUME_BATCH_SIZE: int = 16
+    RESUME_LEASE_SECONDS: int = 300
+    RESUME_HEARTBEAT_SECONDS: int = 60
+    RESUME_MAX_ATTEMPTS: int = 3
+    RESUME_POLL_INTERVAL_SECONDS: int = 60  # fallback when no upload notification arrives
+
+    # Resume detail response cache, RESUME_CACHE_SIZE=0 disables it. Resumes are never edited
+    # through the API, the TTL bounds how long a change made directly in the database stays hidden
+    RESUME_CACHE_SIZE: int = 2048
+    RESUME_CACHE_TTL_SECONDS: int = 300
+
+    # Vector search
+    VECTOR_INDEX_BACKEND: str = "memory"  # "memory", "ivf" or "pgvector"
+    PGVECTOR_EF_SEARCH: int = 40
+    PGVECTOR_ITERATIVE_SCAN: str = ""  # "relaxed_order" or "strict_order" on pgvector >= 0.8, for filtered searches
+    IVF_INDEX_PATH: str = str(Path(ROOT_DIR, "assets", "vector_index"))
+    IVF_NLIST: int = 256
+    IVF_NPROBE: int = 16
+    HYBRID_SEARCH_CANDIDATES: int = 200  # BM25 shortlist that gets re-ranked by vector similarity
+    HYBRID_VECTOR_CANDIDATES: int = 50  # nearest neighbours always added to the shortlist
+    HYBRID_KEYWORD_WEIGHT: float = 0.3  # share of the fused score from BM25, the rest is cosine similarity
+    INDEX_SYNC_GAP_SECONDS: int = 600  # how long an id skipped by sync is re-checked in case it commits late
+    INDEX_SYNC_GAP_WINDOW: int = 10000
     
     class Config:
         env_file = Path(ROOT_DIR, ".env")
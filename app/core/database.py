@@ -1,17 +1,70 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Created on first use so asyncpg is only needed by deployments that use get_async_db
+async_engine = None
+AsyncSessionLocal = None
+
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    query = dict(url.query)
+    # asyncpg takes "ssl" rather than libpq's "sslmode"
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+
+def libpq_dsn(url: str) -> str:
+    # libpq only understands the plain scheme, not SQLAlchemy's "postgresql+psycopg2"
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    global async_engine, AsyncSessionLocal
+    if async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return async_engine
+
+
+async def get_async_db():
+    """
+    AsyncSession for ``async def`` endpoints, queries await on the event loop
+    instead of taking a threadpool slot.
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
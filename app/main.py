@@ -2,10 +2,16 @@ from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.core.config import settings
-from app.core.database import engine, Base, SessionLocal
-from app.services.resume_service import process_pending_resumes
+from app.core import database
+from app.core.database import engine, Base
+from app.utils.embedding import query_cache
+from app.worker import resume_processing_worker
+from sqlalchemy import text
 import threading
-import time
+
+if settings.VECTOR_INDEX_BACKEND == "pgvector":
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -28,20 +34,18 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
-def resume_processing_worker():
-    while True:
-        db = SessionLocal()
-        try:
-            process_pending_resumes(db)
-        finally:
-            db.close()
-        time.sleep(10)  # Check every 10 seconds
-
 @app.on_event("startup")
 def start_resume_processing_worker():
+    if not settings.RUN_RESUME_WORKER:
+        return
     thread = threading.Thread(target=resume_processing_worker, daemon=True)
     thread.start()
 
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
 @app.get("/")
 def root():
     return {"message": f"Welcome to {settings.PROJECT_NAME}"}
@@ -49,4 +53,4 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy", "query_embedding_cache": query_cache.stats()}
\ No newline at end of file
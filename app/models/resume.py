@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Enum as SqlEnum, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Enum as SqlEnum, DateTime, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from app.core.database import Base
@@ -19,8 +19,8 @@ class Resume(Base):
     soft_skills = Column(JSONB, nullable=True)
     programming_languages = Column(JSONB, nullable=True)
     languages = Column(JSONB, nullable=True)
-    total_experience = Column(Float, nullable=True)
-    embedding = Column(JSONB, nullable=True)
+    total_experience = Column(Float, nullable=True, index=True)
+    embedding = Column(LargeBinary, nullable=True)
 
     experience = relationship('ResumeExperience', back_populates='resume', cascade='all, delete-orphan')
     education = relationship('ResumeEducation', back_populates='resume', cascade='all, delete-orphan')
@@ -83,6 +83,18 @@ class ResumeFile(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     file_path = Column(String, nullable=False)
     filename = Column(String, nullable=False)
-    status = Column(SqlEnum(ResumeFileStatus), default=ResumeFileStatus.pending, nullable=False)
+    status = Column(SqlEnum(ResumeFileStatus), default=ResumeFileStatus.pending, nullable=False, index=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+    worker_id = Column(String, nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0, server_default='0', nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ParsedResumeCache(Base):
+    __tablename__ = 'parsed_resume_cache'
+    content_hash = Column(String(64), primary_key=True)
+    parsed = Column(JSONB, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
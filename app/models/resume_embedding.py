@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from pgvector.sqlalchemy import Vector
+from app.core.database import Base
+
+class ResumeEmbedding(Base):
+    __tablename__ = 'resume_embeddings'
+    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+    embedding = Column(Vector(384), nullable=False)
+
+    __table_args__ = (
+        Index(
+            'ix_resume_embeddings_hnsw',
+            'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+        ),
+    )
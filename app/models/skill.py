@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.core.database import Base
+
+class Skill(Base):
+    __tablename__ = 'skills'
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, nullable=False)  # normalised form, see app.utils.skill_index.normalize_skill
+    name = Column(String, nullable=False)
+
+class SkillAlias(Base):
+    __tablename__ = 'skill_aliases'
+    alias = Column(String, primary_key=True)  # normalised form
+    skill_id = Column(Integer, ForeignKey('skills.id', ondelete='CASCADE'), nullable=False)
@@ -25,7 +25,9 @@ class TokenBlacklist(Base):
     __tablename__ = "token_blacklist"
     
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True, index=True, nullable=False)
+    token = Column(String, unique=True, index=True, nullable=True)  # only for legacy tokens without a jti
+    jti = Column(String(64), unique=True, index=True, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class HROnboarding(Base):
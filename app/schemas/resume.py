@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from fastapi import UploadFile
-from typing import List
+from typing import List, Optional
+from app.models.resume import ResumeFileStatus
 
 
 class ResumeParse(BaseModel):
@@ -54,3 +55,96 @@ class ParsedResume(BaseModel):
 
 
 
+
+
+class ResumeSummaryResponse(BaseModel):
+    id: int
+    user_id: int
+    name: str
+    email: str
+    phone: Optional[str] = None
+    linkedin: Optional[str] = None
+    github: Optional[str] = None
+    summary: Optional[str] = None
+    technical_skills: Optional[List[str]] = None
+    soft_skills: Optional[List[str]] = None
+    programming_languages: Optional[List[str]] = None
+    languages: Optional[List[str]] = None
+    total_experience: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class ResumeListResponse(BaseModel):
+    resumes: List[ResumeSummaryResponse]
+    next_cursor: Optional[int] = None
+
+class ResumeMatchResponse(BaseModel):
+    resume: ResumeSummaryResponse
+    match: float
+
+class NlpSearchResponse(BaseModel):
+    results: List[ResumeMatchResponse]
+
+class ResumeExperienceResponse(BaseModel):
+    id: int
+    title: str
+    summary: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    organization: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ResumeEducationResponse(BaseModel):
+    id: int
+    title: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    organization: Optional[str] = None
+    grade: Optional[str] = None
+    percentage: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ResumeProjectResponse(BaseModel):
+    id: int
+    title: str
+    summary: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    technologies: Optional[List[str]] = None
+    programming_languages: Optional[List[str]] = None
+
+    class Config:
+        from_attributes = True
+
+class ResumeCertificationResponse(BaseModel):
+    id: int
+    title: str
+    organization: Optional[str] = None
+    end_date: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ResumeDetailResponse(ResumeSummaryResponse):
+    experience: List[ResumeExperienceResponse] = []
+    education: List[ResumeEducationResponse] = []
+    projects: List[ResumeProjectResponse] = []
+    certifications: List[ResumeCertificationResponse] = []
+
+class ResumeFileResponse(BaseModel):
+    id: int
+    file_path: str
+    filename: str
+    status: ResumeFileStatus
+    user_id: int
+
+    class Config:
+        from_attributes = True
+
+class ResumeFileListResponse(BaseModel):
+    files: List[ResumeFileResponse]
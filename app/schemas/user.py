@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from datetime import datetime
 from typing import Optional
 from app.models.user import UserRole
@@ -23,6 +23,14 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class CurrentUser(UserResponse):
+    """
+    Detached, immutable snapshot of the authenticated user, safe to cache
+    across requests and sessions.
+    """
+    model_config = ConfigDict(frozen=True)
+
+
 class UserInDB(UserBase):
     id: int
     hashed_password: str
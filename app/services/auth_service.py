@@ -1,20 +1,102 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from app.models.user import User, TokenBlacklist
 from app.schemas.auth import UserLogin, UserSignup, Token
 from app.schemas.user import UserCreate
 from app.services.user_service import UserService
-from app.core.security import verify_password, create_access_token, verify_token
+from app.core.security import get_password_hash_async, verify_and_update_password, create_access_token, verify_token
 from app.core.config import settings
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 
 
+class TokenRevocationCache:
+    """
+    Process-local copy of the unexpired token blacklist.
+
+    Entries are keyed on the ``jti`` claim, or on the raw token for tokens
+    issued before jti was added. The set is reloaded at most every
+    ``refresh_seconds``, so checking a token that was not revoked costs no
+    query. Logouts on this process are visible at once, logouts on other
+    replicas after at most one refresh. Expired rows are purged from the
+    table every ``purge_seconds``.
+    """
+
+    def __init__(self, refresh_seconds: float, purge_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.purge_seconds = purge_seconds
+        self._revoked: dict[str, float] = {}
+        self._refreshed_at = None
+        self._purged_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unexpired(now: datetime):
+        # Legacy rows have no expiry, but a token revoked at created_at expires within one token lifetime
+        legacy_cutoff = now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        return or_(
+            TokenBlacklist.expires_at > now,
+            and_(TokenBlacklist.expires_at == None, TokenBlacklist.created_at > legacy_cutoff),
+        )
+
+    @staticmethod
+    def _expired(now: datetime):
+        # Not ~_unexpired(now): for legacy rows that evaluates to NULL, so they would never be deleted
+        legacy_cutoff = now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        return or_(
+            TokenBlacklist.expires_at <= now,
+            and_(TokenBlacklist.expires_at == None, TokenBlacklist.created_at <= legacy_cutoff),
+        )
+
+    def add(self, key: str, expires_at: Optional[datetime]):
+        expires_at = expires_at or datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        with self._lock:
+            self._revoked[key] = expires_at.timestamp()
+
+    def refresh(self, db: Session):
+        now = datetime.now(timezone.utc)
+        rows = (
+            db.query(TokenBlacklist.jti, TokenBlacklist.token, TokenBlacklist.expires_at, TokenBlacklist.created_at)
+            .filter(self._unexpired(now))
+            .all()
+        )
+        lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        loaded = {
+            row.jti or row.token: (row.expires_at or row.created_at + lifetime).timestamp()
+            for row in rows
+        }
+        with self._lock:
+            # Merge rather than replace, a logout on this process may have committed after the query ran
+            self._revoked.update(loaded)
+            cutoff = now.timestamp()
+            self._revoked = {key: expiry for key, expiry in self._revoked.items() if expiry > cutoff}
+            self._refreshed_at = time.monotonic()
+        if self._purged_at is None or time.monotonic() - self._purged_at >= self.purge_seconds:
+            self._purged_at = time.monotonic()
+            db.query(TokenBlacklist).filter(self._expired(now)).delete(synchronize_session=False)
+            db.commit()
+
+    def is_revoked(self, db: Session, key: str) -> bool:
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.refresh(db)
+        return key in self._revoked
+
+
+token_revocations = TokenRevocationCache(
+    refresh_seconds=settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+    purge_seconds=settings.TOKEN_BLACKLIST_PURGE_SECONDS,
+)
+
+
 class AuthService:
     @staticmethod
-    def signup(db: Session, user_data: UserSignup) -> dict:
+    async def signup(db: Session, user_data: UserSignup) -> dict:
         # Check if user already exists
-        existing_user = UserService.get_user_by_email(db, user_data.email)
+        existing_user = await run_in_threadpool(AuthService._get_user_and_release, db, user_data.email)
         print(existing_user)
         if existing_user:
             raise HTTPException(
@@ -24,7 +106,8 @@ class AuthService:
         
         # Create new user
         user_create = UserCreate(**user_data.model_dump())
-        user = UserService.create_user(db, user_create)
+        hashed_password = await get_password_hash_async(user_data.password)
+        user = await run_in_threadpool(UserService.create_user, db, user_create, hashed_password)
         
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -41,9 +124,9 @@ class AuthService:
         }
     
     @staticmethod
-    def login(db: Session, user_data: UserLogin) -> Token:
+    async def login(db: Session, user_data: UserLogin) -> Token:
         # Authenticate user
-        user = AuthService.authenticate_user(db, user_data.email, user_data.password)
+        user = await AuthService.authenticate_user(db, user_data.email, user_data.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,22 +148,41 @@ class AuthService:
     @staticmethod
     def logout(db: Session, token: str) -> dict:
         # Add token to blacklist
-        blacklisted_token = TokenBlacklist(token=token)
+        payload = verify_token(token) or {}
+        jti = payload.get("jti")
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc) if "exp" in payload else None
+        blacklisted_token = TokenBlacklist(jti=jti, token=None if jti else token, expires_at=expires_at)
         db.add(blacklisted_token)
         db.commit()
+        token_revocations.add(jti or token, expires_at)
+        if payload.get("sub"):
+            UserService.invalidate_cached_user(payload["sub"])
         
         return {"message": "Successfully logged out"}
     
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-        user = UserService.get_user_by_email(db, email)
+    def _get_user_and_release(db: Session, email: str) -> Optional[User]:
+        # Hands the connection back to the pool before bcrypt runs, a burst of
+        # logins would otherwise hold one each and starve every other endpoint
+        try:
+            return UserService.get_user_by_email(db, email)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+        user = await run_in_threadpool(AuthService._get_user_and_release, db, email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            # Stored hash predates the configured BCRYPT_ROUNDS
+            await run_in_threadpool(UserService.update_password_hash, db, user, new_hash)
         return user
     
     @staticmethod
-    def is_token_blacklisted(db: Session, token: str) -> bool:
-        blacklisted = db.query(TokenBlacklist).filter(TokenBlacklist.token == token).first()
-        return blacklisted is not None
\ No newline at end of file
+    def is_token_blacklisted(db: Session, token: str, payload: dict) -> bool:
+        # Tokens issued before jti was added are keyed on the token itself
+        return token_revocations.is_revoked(db, payload.get("jti") or token)
\ No newline at end of file
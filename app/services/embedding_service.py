@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+from pathlib import Path
+import numpy as np
+from sentence_transformers import SentenceTransformer
+from app.core.config import settings
+
+
+def load_embedding_model(model_name: str, backend: str = "torch") -> SentenceTransformer:
+    """
+    Load the encoder on the requested backend.
+
+    ``torch`` is the reference sentence-transformers path. ``onnx`` and
+    ``onnx-int8`` export the model to ONNX once under ``EMBEDDING_ONNX_DIR``
+    (the latter with int8 dynamic quantization) and serve it through
+    onnxruntime, which needs requirements-onnx.txt.
+    """
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    export_dir = Path(settings.EMBEDDING_ONNX_DIR, model_name.replace("/", "__"))
+    # The quantizer names the file after its weight type, qint8 or quint8 depending on the target
+    quantized_pattern = f"model_*int8_{settings.EMBEDDING_ONNX_QUANTIZATION}.onnx"
+    if not Path(export_dir, "onnx", "model.onnx").exists():
+        SentenceTransformer(model_name, backend="onnx").save_pretrained(str(export_dir))
+    if backend == "onnx":
+        return SentenceTransformer(str(export_dir), backend="onnx")
+
+    if not any(Path(export_dir, "onnx").glob(quantized_pattern)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        export_dynamic_quantized_onnx_model(
+            SentenceTransformer(str(export_dir), backend="onnx"),
+            settings.EMBEDDING_ONNX_QUANTIZATION,
+            str(export_dir),
+        )
+    quantized_file = next(Path(export_dir, "onnx").glob(quantized_pattern)).name
+    return SentenceTransformer(str(export_dir), backend="onnx", model_kwargs={"file_name": f"onnx/{quantized_file}"})
+
+
+class EmbeddingService:
+    """
+    Process-wide sentence embedding service.
+
+    Holds the only copy of the model. Concurrent ``embed`` calls from request
+    threads and the background worker are gathered for up to
+    ``max_wait_ms`` into batches of at most ``max_batch_size`` and encoded
+    with a single ``encode`` call, then the rows are handed back to callers.
+    """
+
+    def __init__(self, model_name: str, backend: str = "torch", max_batch_size: int = 32, max_wait_ms: float = 5):
+        self.model_name = model_name
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._requests: queue.Queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def model(self) -> SentenceTransformer:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = load_embedding_model(self.model_name, self.backend)
+        return self._model
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.max_batch_size)
+
+    def embed(self, text: str) -> np.ndarray:
+        self._ensure_worker()
+        future: Future = Future()
+        self._requests.put((text, future))
+        return future.result()
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect_batch(self) -> list:
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                vectors = self.embed_batch([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+embedding_service = EmbeddingService(
+    settings.EMBEDDING_MODEL_NAME,
+    backend=settings.EMBEDDING_BACKEND,
+    max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+    max_wait_ms=settings.EMBEDDING_BATCH_WAIT_MS,
+)
@@ -1,50 +1,88 @@
 from fastapi import UploadFile, HTTPException
-from typing import List
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
-from app.models.resume import Resume, ResumeExperience, ResumeEducation, ResumeProject, ResumeCertification, ResumeFile, ResumeFileStatus
-from app.schemas.resume import ParsedResume
+from app.models.resume import Resume, ResumeExperience, ResumeEducation, ResumeProject, ResumeCertification, ResumeFile, ResumeFileStatus, ParsedResumeCache
+from app.schemas.resume import ParsedResume, ResumeDetailResponse
 import json
-from groq import Groq
+import asyncio
+import io
+from groq import Groq, AsyncGroq
 import instructor
-from pypdf import PdfReader, PageObject
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 import os
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from app.utils.pdf import extract_resume_text
 from app.utils.resume import getParseMessage
-from sentence_transformers import SentenceTransformer
-import numpy as np
-from sqlalchemy import LargeBinary
-from app.utils.embedding import embed_text, cosine_similarity
+from app.utils.embedding import embed_query, encode_embedding, to_vector
+from app.services.embedding_service import embedding_service
+from app.utils.vector_index import VectorIndex
+from app.utils.response_cache import ResponseCache
+from app.utils.bm25 import BM25Index, resume_terms
+from app.utils.skill_index import SkillIndex, SkillVocabulary
+from sqlalchemy.orm import defer, joinedload, load_only, selectinload
+from sqlalchemy import exists, insert, or_, text
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import func
+from app.core.database import SessionLocal
 from app.services.user_service import HROnboardingService
 
 client = Groq(api_key=settings.GROQ_API_KEY)
 client = instructor.from_groq(client)
+async_client = instructor.from_groq(AsyncGroq(api_key=settings.GROQ_API_KEY))
 
-# Load a pre-trained model (do this once at startup)
-model = SentenceTransformer('all-MiniLM-L6-v2')
+if settings.VECTOR_INDEX_BACKEND == "pgvector":
+    from app.utils.pgvector_index import PgVectorIndex
+    resume_index = PgVectorIndex()
+elif settings.VECTOR_INDEX_BACKEND == "ivf":
+    from app.utils.ivf_index import IVFIndex
+    resume_index = IVFIndex(settings.IVF_INDEX_PATH, nlist=settings.IVF_NLIST, nprobe=settings.IVF_NPROBE)
+else:
+    resume_index = VectorIndex()
 
-def embed_text(text: str) -> np.ndarray:
-    return model.encode([text])[0]
+keyword_index = BM25Index()
+skill_index = SkillIndex(SkillVocabulary())
 
-def cosine_similarity(a, b):
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+resume_cache = ResponseCache(max_size=settings.RESUME_CACHE_SIZE, ttl_seconds=settings.RESUME_CACHE_TTL_SECONDS)
 
-def parse_single_resume(file: UploadFile) -> ParsedResume:
-    try:
-        reader = PdfReader(file.file)
+def parse_resume_text(resume_content: str) -> ParsedResume:
+    messages = getParseMessage(resume_content)
+    return client.chat.completions.create(
+        messages=messages, model="llama-3.3-70b-versatile", temperature=0, response_model=ParsedResume
+    )
 
-        resumeContent = ""
+def build_resume_text(parsed: ParsedResume) -> str:
+    return f"{parsed.name} {parsed.summary} {' '.join(parsed.technical_skills)} {' '.join(parsed.programming_languages)}"
 
-        for page in reader.pages:
-            # resume = extract_links(page, resume)
-            resumeContent += page.extract_text() + "\n\n"
+async def parse_resume_text_async(resume_content: str) -> ParsedResume:
+    messages = getParseMessage(resume_content)
+    return await async_client.chat.completions.create(
+        messages=messages, model="llama-3.3-70b-versatile", temperature=0, response_model=ParsedResume
+    )
 
-        messages = getParseMessage(resumeContent)
-        response = client.chat.completions.create(
-            messages=messages, model="llama-3.3-70b-versatile", temperature=0, response_model=ParsedResume
-        )
+_parse_semaphore = None
 
-        return response
+def _get_parse_semaphore() -> asyncio.Semaphore:
+    global _parse_semaphore
+    if _parse_semaphore is None:
+        _parse_semaphore = asyncio.Semaphore(settings.RESUME_LLM_CONCURRENCY)
+    return _parse_semaphore
+
+async def parse_single_resume(file: UploadFile) -> ParsedResume:
+    try:
+        content = await file.read()
+        resume_content = await extract_resume_text_async(content)
+        async with _get_parse_semaphore():
+            return await parse_resume_text_async(resume_content)
     except Exception as e:
+        print(e)
         raise HTTPException(status_code=500, detail=str("Error parsing resume"))
         return None
 
@@ -68,225 +106,288 @@ def parse_single_resume(file: UploadFile) -> ParsedResume:
     #     total_experience=5.0
     # )
 
+def save_parsed_resumes(db: Session, resumes: List[Tuple[int, ParsedResume, object]]) -> List[int]:
+    """
+    Write a batch of ``(user_id, parsed, embedding)`` resumes in one transaction.
+
+    Resumes and each child table are written with one multi-row INSERT each,
+    so round trips stay constant however many rows the batch has. Anything
+    already pending on ``db`` is committed along with them. pgvector rows
+    are part of the same transaction, the in-memory indexes are updated
+    after the commit.
+    """
+    if not resumes:
+        db.commit()
+        return []
+    resume_ids = db.execute(
+        insert(Resume).returning(Resume.id, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "name": parsed.name,
+                "email": parsed.email,
+                "phone": parsed.phone,
+                "linkedin": parsed.linkedin,
+                "github": parsed.github,
+                "summary": parsed.summary,
+                "technical_skills": parsed.technical_skills,
+                "soft_skills": parsed.soft_skills,
+                "programming_languages": parsed.programming_languages,
+                "languages": parsed.languages,
+                "total_experience": parsed.total_experience,
+                "embedding": encode_embedding(embedding),
+            }
+            for user_id, parsed, embedding in resumes
+        ],
+    ).scalars().all()
+
+    children = {ResumeExperience: [], ResumeEducation: [], ResumeProject: [], ResumeCertification: []}
+    for resume_id, (_, parsed, _) in zip(resume_ids, resumes):
+        children[ResumeExperience].extend({"resume_id": resume_id, **exp.model_dump()} for exp in parsed.experiences)
+        children[ResumeEducation].extend({"resume_id": resume_id, **edu.model_dump()} for edu in parsed.educations)
+        children[ResumeProject].extend({"resume_id": resume_id, **proj.model_dump()} for proj in parsed.projects)
+        children[ResumeCertification].extend({"resume_id": resume_id, **cert.model_dump()} for cert in parsed.certifications)
+    for model, rows in children.items():
+        if rows:
+            db.execute(insert(model), rows)
+    if settings.VECTOR_INDEX_BACKEND == "pgvector":
+        # The vectors live in Postgres, write them in the same transaction as the resumes
+        resume_index.add_many(db, [(resume_id, embedding) for resume_id, (_, _, embedding) in zip(resume_ids, resumes)])
+    db.commit()
+
+    try:
+        for resume_id, (_, parsed, embedding) in zip(resume_ids, resumes):
+            technologies = [technology for project in parsed.projects for technology in project.technologies]
+            if settings.VECTOR_INDEX_BACKEND != "pgvector":
+                resume_index.add(resume_id, embedding)
+            keyword_index.add(resume_id, resume_terms(
+                parsed.technical_skills, parsed.programming_languages, technologies, parsed.summary
+            ))
+            skill_index.add(resume_id, {
+                "technical_skills": parsed.technical_skills,
+                "programming_languages": parsed.programming_languages,
+                "project_technologies": technologies,
+            }, parsed.total_experience)
+    except Exception as e:
+        # The rows are committed, the next index sync picks them up
+        print(e)
+    return resume_ids
+
 class ResumeService:
     @staticmethod
-    def parse_resume(db: Session, resumes: List[UploadFile], user_id: int) -> str:
-        for file in resumes:
-            parsed: ParsedResume = parse_single_resume(file)
-            resume_obj = Resume(
-                user_id=user_id,
-                name=parsed.name,
-                email=parsed.email,
-                phone=parsed.phone,
-                linkedin=parsed.linkedin,
-                github=parsed.github,
-                summary=parsed.summary,
-                technical_skills=parsed.technical_skills,
-                soft_skills=parsed.soft_skills,
-                programming_languages=parsed.programming_languages,
-                languages=parsed.languages,
-                total_experience=parsed.total_experience
-            )
-            db.add(resume_obj)
-            db.flush()  # To get resume_obj.id
-            # Experience
-            for exp in parsed.experiences:
-                db.add(ResumeExperience(
-                    resume_id=resume_obj.id,
-                    title=exp.title,
-                    summary=exp.summary,
-                    start_date=exp.start_date,
-                    end_date=exp.end_date,
-                    organization=exp.organization
-                ))
-            # Education
-            for edu in parsed.educations:
-                db.add(ResumeEducation(
-                    resume_id=resume_obj.id,
-                    title=edu.title,
-                    start_date=edu.start_date,
-                    end_date=edu.end_date,
-                    organization=edu.organization,
-                    grade=edu.grade,
-                    percentage=edu.percentage
-                ))
-            # Projects
-            for proj in parsed.projects:
-                db.add(ResumeProject(
-                    resume_id=resume_obj.id,
-                    title=proj.title,
-                    summary=proj.summary,
-                    start_date=proj.start_date,
-                    end_date=proj.end_date,
-                    technologies=proj.technologies,
-                    programming_languages=proj.programming_languages
-                ))
-            # Certifications
-            for cert in parsed.certifications:
-                db.add(ResumeCertification(
-                    resume_id=resume_obj.id,
-                    title=cert.title,
-                    organization=cert.organization,
-                    end_date=cert.end_date
-                ))
-            resume_text = f"{parsed.name} {parsed.summary} {' '.join(parsed.technical_skills)} {' '.join(parsed.programming_languages)}"
-            embedding = embed_text(resume_text).tolist()
-            resume_obj.embedding = embedding
-            db.commit()
+    async def parse_resume(db: Session, resumes: List[UploadFile], user_id: int) -> str:
+        # Files are parsed concurrently, the semaphore caps in-flight LLM calls across all requests
+        parsed_resumes = await asyncio.gather(*(parse_single_resume(file) for file in resumes))
+        embeddings = await run_in_threadpool(
+            embedding_service.embed_batch, [build_resume_text(parsed) for parsed in parsed_resumes]
+        )
+        await run_in_threadpool(
+            save_parsed_resumes, db, [(user_id, parsed, embedding) for parsed, embedding in zip(parsed_resumes, embeddings)]
+        )
         return "All resumes parsed and saved successfully."
     
     @staticmethod
-    def get_public_resumes(db: Session):
+    def get_public_resumes(db: Session, cursor: int = None, limit: int = 50):
+        """
+        One page of candidate resumes in id order, with the id to pass as
+        ``cursor`` for the next page (None on the last page).
+        """
         from app.models.user import User, UserRole
         from app.models.resume import Resume
-        candidate_ids = [u.id for u in db.query(User).filter(User.role == UserRole.candidate).all()]
-        resumes = db.query(Resume).filter(Resume.user_id.in_(candidate_ids)).all()
-        return [
-            {
-                "id": r.id,
-                "user_id": r.user_id,
-                "name": r.name,
-                "email": r.email,
-                "phone": r.phone,
-                "linkedin": r.linkedin,
-                "github": r.github,
-                "summary": r.summary,
-                "technical_skills": r.technical_skills,
-                "soft_skills": r.soft_skills,
-                "programming_languages": r.programming_languages,
-                "languages": r.languages,
-                "total_experience": r.total_experience
-            } for r in resumes
-        ]
+        query = (
+            db.query(Resume)
+            .join(User, User.id == Resume.user_id)
+            .filter(User.role == UserRole.candidate)
+            .options(load_only(
+                Resume.id, Resume.user_id, Resume.name, Resume.email, Resume.phone, Resume.linkedin,
+                Resume.github, Resume.summary, Resume.technical_skills, Resume.soft_skills,
+                Resume.programming_languages, Resume.languages, Resume.total_experience
+            ))
+            .order_by(Resume.id)
+        )
+        if cursor is not None:
+            query = query.filter(Resume.id > cursor)
+        resumes = query.limit(limit + 1).all()
+        next_cursor = resumes[limit - 1].id if len(resumes) > limit else None
+        return resumes[:limit], next_cursor
 
     @staticmethod
     def get_resumes_by_user(db: Session, user_id: int):
         from app.models.resume import Resume
-        resumes = db.query(Resume).filter(Resume.user_id == user_id).all()
-        return [
-            {
-                "id": r.id,
-                "user_id": r.user_id,
-                "name": r.name,
-                "email": r.email,
-                "phone": r.phone,
-                "linkedin": r.linkedin,
-                "github": r.github,
-                "summary": r.summary,
-                "technical_skills": r.technical_skills,
-                "soft_skills": r.soft_skills,
-                "programming_languages": r.programming_languages,
-                "languages": r.languages,
-                "total_experience": r.total_experience
-            } for r in resumes
-        ]
+        return db.query(Resume).options(defer(Resume.embedding)).filter(Resume.user_id == user_id).order_by(Resume.id).all()
 
     @staticmethod
-    def get_resume_by_id(db: Session, resume_id: int, current_user):
-        from app.models.user import User, UserRole
-        from app.models.resume import Resume
-        resume = db.query(Resume).filter(Resume.id == resume_id).first()
-        if not resume:
-            return None, "Resume not found"
-        uploader = db.query(User).filter(User.id == resume.user_id).first()
-        if not uploader:
-            return None, "Uploader not found"
-        if current_user.role == UserRole.candidate and current_user.id != uploader.id:
+    def get_cached_resume(db: Session, resume_id: int, current_user):
+        """
+        Returns ``((etag, resume), error)``. Serialised resumes are cached per
+        id; the access check runs on every call.
+        """
+        from app.models.user import UserRole
+        entry = resume_cache.get(resume_id)
+        if entry is None:
+            # Two queries: the short collections are joined onto the resume row, projects (the longest, with
+            # technology lists) come in one selectin query. Joining all four would multiply every row count
+            resume = (
+                db.query(Resume)
+                .options(
+                    defer(Resume.embedding),
+                    joinedload(Resume.experience),
+                    joinedload(Resume.education),
+                    joinedload(Resume.certifications),
+                    selectinload(Resume.projects),
+                )
+                .filter(Resume.id == resume_id)
+                .first()
+            )
+            if not resume:
+                return None, "Resume not found"
+            entry = resume_cache.put(resume_id, ResumeService._serialize_resume(resume))
+        # user_id is a non-null foreign key, so the uploader always exists
+        if current_user.role == UserRole.candidate and current_user.id != entry[1]["user_id"]:
             return None, "Not authorized to access this resume"
-        experience = [
-            {
-                "id": e.id,
-                "title": e.title,
-                "summary": e.summary,
-                "start_date": e.start_date,
-                "end_date": e.end_date,
-                "organization": e.organization
-            } for e in resume.experience
-        ]
-        education = [
-            {
-                "id": e.id,
-                "title": e.title,
-                "start_date": e.start_date,
-                "end_date": e.end_date,
-                "organization": e.organization,
-                "grade": e.grade,
-                "percentage": e.percentage
-            } for e in resume.education
-        ]
-        projects = [
-            {
-                "id": p.id,
-                "title": p.title,
-                "summary": p.summary,
-                "start_date": p.start_date,
-                "end_date": p.end_date,
-                "technologies": p.technologies,
-                "programming_languages": p.programming_languages
-            } for p in resume.projects
-        ]
-        certifications = [
-            {
-                "id": c.id,
-                "title": c.title,
-                "organization": c.organization,
-                "end_date": c.end_date
-            } for c in resume.certifications
-        ]
-        return {
-            "id": resume.id,
-            "user_id": resume.user_id,
-            "name": resume.name,
-            "email": resume.email,
-            "phone": resume.phone,
-            "linkedin": resume.linkedin,
-            "github": resume.github,
-            "summary": resume.summary,
-            "technical_skills": resume.technical_skills,
-            "soft_skills": resume.soft_skills,
-            "programming_languages": resume.programming_languages,
-            "languages": resume.languages,
-            "total_experience": resume.total_experience,
-            "experience": experience,
-            "education": education,
-            "projects": projects,
-            "certifications": certifications
-        }, None
-        
+        return entry, None
+
+    @staticmethod
+    def get_resume_by_id(db: Session, resume_id: int, current_user):
+        entry, error = ResumeService.get_cached_resume(db, resume_id, current_user)
+        if error:
+            return None, error
+        return entry[1], None
+
+    @staticmethod
+    def _serialize_resume(resume: Resume) -> dict:
+        return ResumeDetailResponse.model_validate(resume).model_dump(mode="json")
+
+    @staticmethod
+    def filter_resume_ids(
+        db: Session,
+        min_experience: float = None,
+        skills: List[str] = None,
+        languages: List[str] = None,
+        any_skills: List[str] = None,
+    ) -> Optional[List[int]]:
+        """
+        Ids of resumes matching every filter, or None if the filters exclude
+        nothing. ``skills`` are matched against technical skills, ``languages``
+        against programming languages and ``any_skills`` against both plus
+        project technologies, all on canonical skill ids through the in-memory
+        index. Experience is checked against the same index.
+        """
+        skill_index.sync(db)
+        matched = None
+        if skills or languages or any_skills:
+            matched = skill_index.match(
+                all_of={"technical_skills": skills or [], "programming_languages": languages or []},
+                any_of=any_skills or [],
+            )
+            if not matched:
+                return []
+        if min_experience is not None:
+            return skill_index.with_experience(min_experience, within=matched)
+        return list(matched) if matched is not None else None
+
+    @staticmethod
+    def filter_predicates(
+        min_experience: float = None,
+        skills: List[str] = None,
+        languages: List[str] = None,
+        any_skills: List[str] = None,
+    ) -> list:
+        """
+        The same filters as ``filter_resume_ids`` as SQL predicates on Resume,
+        for backends that rank in Postgres. Each skill matches every stored
+        spelling the vocabulary maps to it.
+        """
+        vocabulary = skill_index.vocabulary
+        predicates = []
+        if min_experience is not None:
+            predicates.append(Resume.total_experience >= min_experience)
+        for raw in skills or []:
+            predicates.append(Resume.technical_skills.has_any(array(vocabulary.spellings(raw))))
+        for raw in languages or []:
+            predicates.append(Resume.programming_languages.has_any(array(vocabulary.spellings(raw))))
+        if any_skills:
+            spellings = array(sorted({spelling for raw in any_skills for spelling in vocabulary.spellings(raw)}))
+            predicates.append(or_(
+                Resume.technical_skills.has_any(spellings),
+                Resume.programming_languages.has_any(spellings),
+                exists().where(ResumeProject.resume_id == Resume.id, ResumeProject.technologies.has_any(spellings)),
+            ))
+        return predicates
+
     @staticmethod
-    def nlp_search(db: Session, query: str):
-        query_vec = embed_text(query)
-        resumes = db.query(Resume).filter(Resume.embedding != None).all()
+    def nlp_search(
+        db: Session,
+        query: str,
+        min_experience: float = None,
+        skills: List[str] = None,
+        languages: List[str] = None,
+        any_skills: List[str] = None,
+    ):
+        query_vec = embed_query(query)
+        resume_index.sync(db)
+        keyword_index.sync(db)
+        resume_ids = None
+        where = None
+        if min_experience is not None or skills or languages or any_skills:
+            resume_ids = ResumeService.filter_resume_ids(db, min_experience, skills, languages, any_skills)
+            if resume_ids is not None and not resume_ids:
+                return []
+            if resume_ids is not None and settings.VECTOR_INDEX_BACKEND == "pgvector":
+                where = ResumeService.filter_predicates(min_experience, skills, languages, any_skills)
+        matches = ResumeService._hybrid_search(db, query, query_vec, k=10, resume_ids=resume_ids, where=where)
+        if not matches:
+            return []
+        resumes = db.query(Resume).options(defer(Resume.embedding)).filter(Resume.id.in_([resume_id for resume_id, _, _ in matches])).all()
+        resumes_by_id = {r.id: r for r in resumes}
         results = []
-        for resume in resumes:
-            # Cross-compatible: handle both list (new) and bytes (old)
-            if isinstance(resume.embedding, list):
-                resume_vec = np.array(resume.embedding, dtype=np.float32)
-            else:
-                resume_vec = np.frombuffer(resume.embedding, dtype=np.float32)
-            score = cosine_similarity(query_vec, resume_vec)
-            match_pct = round(float(score) * 100, 2)
-            results.append({
-                "resume": {
-                    "id": resume.id,
-                    "user_id": resume.user_id,
-                    "name": resume.name,
-                    "email": resume.email,
-                    "phone": resume.phone,
-                    "linkedin": resume.linkedin,
-                    "github": resume.github,
-                    "summary": resume.summary,
-                    "technical_skills": resume.technical_skills,
-                    "soft_skills": resume.soft_skills,
-                    "programming_languages": resume.programming_languages,
-                    "languages": resume.languages,
-                    "total_experience": resume.total_experience
-                },
-                "match": match_pct
-            })
-        # Sort by match percentage, descending
-        results.sort(key=lambda x: x["match"], reverse=True)
-        return results[:10]  # Return top 10 matches
+        # Ranked by the fused score, match stays the cosine similarity it always was
+        for resume_id, _, similarity in matches:
+            resume = resumes_by_id.get(resume_id)
+            if resume is None:
+                # Deleted since it was indexed
+                resume_index.remove(resume_id)
+                keyword_index.remove(resume_id)
+                skill_index.remove(resume_id)
+                resume_cache.invalidate(resume_id)
+                continue
+            match_pct = round(float(similarity) * 100, 2)
+            results.append({"resume": resume, "match": match_pct})
+        return results  # Already ordered by relevance, top 10
+
+    @staticmethod
+    def _hybrid_search(db: Session, query: str, query_vec, k: int = 10, resume_ids: List[int] = None, where: list = None):
+        """
+        The BM25 shortlist and the nearest vector neighbours are merged, then
+        re-ranked by a weighted sum of the max-normalised BM25 score and
+        cosine similarity. With ``resume_ids`` both only consider those
+        resumes. ``where`` passes the same filters as SQL predicates to a
+        backend that ranks in Postgres, so the id set never goes back to the
+        database. Returns ``(resume_id, fused_score, similarity)`` tuples.
+        """
+        keyword_hits = keyword_index.search(query, k=settings.HYBRID_SEARCH_CANDIDATES, resume_ids=resume_ids)
+        # Always merged in, a query full of common words can fill the BM25
+        # shortlist without reaching the semantically closest resumes
+        vector_k = max(k, settings.HYBRID_VECTOR_CANDIDATES)
+        if resume_ids is None:
+            nearest = resume_index.search(db, query_vec, vector_k)
+        elif where is not None:
+            nearest = resume_index.search(db, query_vec, vector_k, where=where)
+        else:
+            nearest = sorted(resume_index.score(db, query_vec, resume_ids), key=lambda match: match[1], reverse=True)[:vector_k]
+        best = max((score for _, score in keyword_hits), default=0.0) or 1.0
+        keyword_scores = {resume_id: score / best for resume_id, score in keyword_hits}
+        similarities = dict(nearest)
+        unscored = [resume_id for resume_id in keyword_scores if resume_id not in similarities]
+        if unscored:
+            similarities.update(resume_index.score(db, query_vec, unscored))
+        weight = settings.HYBRID_KEYWORD_WEIGHT
+        fused = [
+            (resume_id, weight * keyword_scores.get(resume_id, 0.0) + (1 - weight) * similarity, similarity)
+            for resume_id, similarity in similarities.items()
+        ]
+        fused.sort(key=lambda match: match[1], reverse=True)
+        return fused[:k]
 
     @staticmethod
     def generate_outreach_email(db, resume_id: int, hr_user):
@@ -332,81 +433,277 @@ Write a professional outreach email introducing yourself and your company, and e
         email = response.choices[0].message.content.strip()
         return email
 
+_pdf_pool = None
+_llm_pool = None
+_pools_lock = threading.Lock()
+
+def _new_pdf_pool() -> ProcessPoolExecutor:
+    # spawn rather than fork: the API process already runs threads. Children only import app.utils.pdf
+    # and the main module, which is why app.worker keeps its heavy imports inside functions
+    return ProcessPoolExecutor(max_workers=settings.RESUME_PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+def _get_worker_pools():
+    global _pdf_pool, _llm_pool
+    with _pools_lock:
+        if _pdf_pool is None:
+            _pdf_pool = _new_pdf_pool()
+            _llm_pool = ThreadPoolExecutor(max_workers=settings.RESUME_LLM_CONCURRENCY, thread_name_prefix="resume-llm")
+        return _pdf_pool, _llm_pool
+
+def _replace_pdf_pool(broken_pool: ProcessPoolExecutor):
+    """
+    Swap in a fresh PDF pool after a child died (OOM, segfault in pypdf).
+
+    A broken ProcessPoolExecutor rejects all further work, so without this
+    one bad PDF would fail every later upload in the process.
+    """
+    global _pdf_pool
+    with _pools_lock:
+        if _pdf_pool is broken_pool:
+            _pdf_pool = _new_pdf_pool()
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+async def extract_resume_text_async(content: bytes) -> str:
+    for attempt in range(2):
+        pdf_pool, _ = _get_worker_pools()
+        try:
+            return await asyncio.wrap_future(pdf_pool.submit(extract_resume_text, io.BytesIO(content)))
+        except BrokenProcessPool:
+            # The child may have been killed by another request's PDF, so try once more on a fresh pool
+            _replace_pdf_pool(pdf_pool)
+            if attempt:
+                raise
+
+WORKER_ID = settings.WORKER_ID or f"{socket.gethostname()}-{os.getpid()}"
+RESUME_FILES_CHANNEL = "resume_files"
+
+resume_files_ready = threading.Event()
+
+def notify_resume_files_ready(db: Session):
+    # Wake the local worker now and workers on other replicas through LISTEN/NOTIFY
+    db.execute(text(f"NOTIFY {RESUME_FILES_CHANNEL}"))
+    db.commit()
+    resume_files_ready.set()
+
+def claim_pending_resume_files(db: Session, limit: int) -> List[ResumeFile]:
+    """
+    Atomically claim up to ``limit`` pending files for this worker.
+
+    Rows locked by another replica's claim are skipped rather than waited
+    on, so concurrent workers always get disjoint batches.
+    """
+    file_records = (
+        db.query(ResumeFile)
+        .filter(ResumeFile.status == ResumeFileStatus.pending)
+        .order_by(ResumeFile.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for file_record in file_records:
+        file_record.status = ResumeFileStatus.processing
+        file_record.worker_id = WORKER_ID
+        file_record.claimed_at = func.now()
+        file_record.lease_expires_at = func.now() + timedelta(seconds=settings.RESUME_LEASE_SECONDS)
+        file_record.attempts = ResumeFile.attempts + 1
+    db.commit()
+    return file_records
+
+def extend_resume_file_leases(db: Session, file_ids: List[int]):
+    db.query(ResumeFile).filter(
+        ResumeFile.id.in_(file_ids),
+        ResumeFile.worker_id == WORKER_ID,
+        ResumeFile.status == ResumeFileStatus.processing,
+    ).update(
+        {ResumeFile.lease_expires_at: func.now() + timedelta(seconds=settings.RESUME_LEASE_SECONDS)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+def complete_resume_files(db: Session, file_ids: List[int], status: ResumeFileStatus) -> bool:
+    """
+    Set the final status of claimed files, in the caller's transaction.
+
+    Only rows this worker still holds an unexpired lease on are updated. A
+    False return means some lease was lost, the files may already belong to
+    another worker, and the caller must roll back instead of committing.
+    """
+    if not file_ids:
+        return True
+    updated = db.query(ResumeFile).filter(
+        ResumeFile.id.in_(file_ids),
+        ResumeFile.worker_id == WORKER_ID,
+        ResumeFile.status == ResumeFileStatus.processing,
+        ResumeFile.lease_expires_at > func.now(),
+    ).update(
+        {ResumeFile.status: status, ResumeFile.lease_expires_at: None},
+        synchronize_session=False,
+    )
+    return updated == len(file_ids)
+
+def reap_expired_resume_files(db: Session) -> int:
+    """
+    Return files whose worker stopped heartbeating to the queue.
+
+    Files that already used up ``RESUME_MAX_ATTEMPTS`` are marked failed
+    instead, so a PDF that crashes the worker cannot loop forever.
+    """
+    expired = (
+        ResumeFile.status == ResumeFileStatus.processing,
+        or_(ResumeFile.lease_expires_at == None, ResumeFile.lease_expires_at < func.now()),
+    )
+    failed = db.query(ResumeFile).filter(*expired, ResumeFile.attempts >= settings.RESUME_MAX_ATTEMPTS).update(
+        {ResumeFile.status: ResumeFileStatus.failed, ResumeFile.lease_expires_at: None},
+        synchronize_session=False,
+    )
+    requeued = db.query(ResumeFile).filter(*expired).update(
+        {ResumeFile.status: ResumeFileStatus.pending, ResumeFile.worker_id: None, ResumeFile.lease_expires_at: None},
+        synchronize_session=False,
+    )
+    db.commit()
+    return failed + requeued
+
+@contextmanager
+def resume_file_lease_heartbeat(file_ids: List[int]):
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(settings.RESUME_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                extend_resume_file_leases(db, file_ids)
+            except Exception as e:
+                print(e)
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=heartbeat, name="resume-lease-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
 def process_pending_resumes(db: Session):
-    pending_files = db.query(ResumeFile).filter(ResumeFile.status == ResumeFileStatus.pending).all()
-    for file_record in pending_files:
+    reap_expired_resume_files(db)
+    while True:
+        batch = claim_pending_resume_files(db, settings.RESUME_BATCH_SIZE)
+        if not batch:
+            break
+        with resume_file_lease_heartbeat([file_record.id for file_record in batch]):
+            process_resume_batch(db, batch)
+
+def process_resume_batch(db: Session, file_records: List[ResumeFile]):
+    """
+    Run a claimed batch through the pipeline: PDF text extraction in a process
+    pool, LLM parsing with bounded concurrency, one embedding call for the
+    whole batch and a single commit.
+
+    Files whose content hash is already in ``parsed_resume_cache`` skip the
+    pipeline entirely, and identical files within a batch are parsed once.
+    """
+    if not file_records:
+        return
+    pdf_pool, llm_pool = _get_worker_pools()
+
+    hashes = {f.content_hash for f in file_records if f.content_hash}
+    cached = {
+        c.content_hash: c
+        for c in db.query(ParsedResumeCache).filter(ParsedResumeCache.content_hash.in_(hashes)).all()
+    } if hashes else {}
+    parsed_files = []
+    groups = {}
+    for file_record in file_records:
+        hit = cached.get(file_record.content_hash)
+        if hit is not None:
+            parsed_files.append((file_record, ParsedResume.model_validate(hit.parsed), to_vector(hit.embedding)))
+        else:
+            groups.setdefault(file_record.content_hash or f"id:{file_record.id}", []).append(file_record)
+
+    # Each PDF goes to the LLM as soon as its text is ready
+    text_futures = {}
+    broken = []
+    for group in groups.values():
         try:
-            file_record.status = ResumeFileStatus.processing
-            db.commit()
-            with open(file_record.file_path, "rb") as f:
-                # Use UploadFile-like interface for parse_single_resume
-                class DummyUploadFile:
-                    def __init__(self, file, filename):
-                        self.file = file
-                        self.filename = filename
-                dummy_file = DummyUploadFile(f, os.path.basename(file_record.file_path))
-                parsed = parse_single_resume(dummy_file)
-            # Save parsed resume (reuse logic from parse_resume)
-            resume_obj = Resume(
-                user_id=file_record.user_id,
-                name=parsed.name,
-                email=parsed.email,
-                phone=parsed.phone,
-                linkedin=parsed.linkedin,
-                github=parsed.github,
-                summary=parsed.summary,
-                technical_skills=parsed.technical_skills,
-                soft_skills=parsed.soft_skills,
-                programming_languages=parsed.programming_languages,
-                languages=parsed.languages,
-                total_experience=parsed.total_experience
-            )
-            db.add(resume_obj)
-            db.flush()
-            for exp in getattr(parsed, 'experiences', []):
-                db.add(ResumeExperience(
-                    resume_id=resume_obj.id,
-                    title=exp.title,
-                    summary=exp.summary,
-                    start_date=exp.start_date,
-                    end_date=exp.end_date,
-                    organization=exp.organization
-                ))
-            for edu in getattr(parsed, 'educations', []):
-                db.add(ResumeEducation(
-                    resume_id=resume_obj.id,
-                    title=edu.title,
-                    start_date=edu.start_date,
-                    end_date=edu.end_date,
-                    organization=edu.organization,
-                    grade=edu.grade,
-                    percentage=edu.percentage
-                ))
-            for proj in getattr(parsed, 'projects', []):
-                db.add(ResumeProject(
-                    resume_id=resume_obj.id,
-                    title=proj.title,
-                    summary=proj.summary,
-                    start_date=proj.start_date,
-                    end_date=proj.end_date,
-                    technologies=proj.technologies,
-                    programming_languages=proj.programming_languages
-                ))
-            for cert in getattr(parsed, 'certifications', []):
-                db.add(ResumeCertification(
-                    resume_id=resume_obj.id,
-                    title=cert.title,
-                    organization=cert.organization,
-                    end_date=cert.end_date
-                ))
-            resume_text = f"{parsed.name} {parsed.summary} {' '.join(parsed.technical_skills)} {' '.join(parsed.programming_languages)}"
-            embedding = embed_text(resume_text).tolist()
-            resume_obj.embedding = embedding
-            file_record.status = ResumeFileStatus.parsed
-            db.commit()
-            # Delete the file from storage
-            if os.path.exists(file_record.file_path):
-                os.remove(file_record.file_path)
+            text_futures[pdf_pool.submit(extract_resume_text, group[0].file_path)] = group
+        except BrokenProcessPool:
+            broken.append(group)
+    parse_futures = {}
+    failed = []
+    for future in as_completed(text_futures):
+        try:
+            parse_futures[llm_pool.submit(parse_resume_text, future.result())] = text_futures[future]
+        except BrokenProcessPool:
+            broken.append(text_futures[future])
         except Exception as e:
-            file_record.status = ResumeFileStatus.failed
+            failed.extend(text_futures[future])
+    if broken:
+        # A dead child fails every PDF queued on the pool, so rerun those one
+        # at a time on a fresh pool and fail only the group that crashes it
+        _replace_pdf_pool(pdf_pool)
+        for group in broken:
+            pdf_pool, _ = _get_worker_pools()
+            try:
+                text = pdf_pool.submit(extract_resume_text, group[0].file_path).result()
+            except BrokenProcessPool:
+                _replace_pdf_pool(pdf_pool)
+                failed.extend(group)
+                continue
+            except Exception as e:
+                failed.extend(group)
+                continue
+            parse_futures[llm_pool.submit(parse_resume_text, text)] = group
+    parsed_groups = []
+    for future in as_completed(parse_futures):
+        try:
+            parsed_groups.append((parse_futures[future], future.result()))
+        except Exception as e:
+            failed.extend(parse_futures[future])
+
+    failed_ids = [file_record.id for file_record in failed]
+    if not parsed_files and not parsed_groups:
+        if complete_resume_files(db, failed_ids, ResumeFileStatus.failed):
             db.commit()
+        else:
+            db.rollback()
+        return
+
+    try:
+        new_cache_entries = []
+        if parsed_groups:
+            embeddings = embedding_service.embed_batch([build_resume_text(parsed) for _, parsed in parsed_groups])
+            for (group, parsed), embedding in zip(parsed_groups, embeddings):
+                parsed_files.extend((file_record, parsed, embedding) for file_record in group)
+                if group[0].content_hash:
+                    new_cache_entries.append({
+                        "content_hash": group[0].content_hash,
+                        "parsed": parsed.model_dump(),
+                        "embedding": encode_embedding(embedding),
+                    })
+        if new_cache_entries:
+            db.execute(pg_insert(ParsedResumeCache).values(new_cache_entries).on_conflict_do_nothing())
+        parsed_paths = [file_record.file_path for file_record, _, _ in parsed_files]
+        parsed_ids = [file_record.id for file_record, _, _ in parsed_files]
+        if not (
+            complete_resume_files(db, failed_ids, ResumeFileStatus.failed)
+            and complete_resume_files(db, parsed_ids, ResumeFileStatus.parsed)
+        ):
+            # The lease ran out and the batch may have been reclaimed, the new owner reports the outcome
+            print(f"Lost the lease on resume files {sorted(failed_ids + parsed_ids)}, discarding this batch")
+            db.rollback()
+            return
+        # Commits the status updates above in the same transaction as the resumes
+        save_parsed_resumes(db, [(file_record.user_id, parsed, embedding) for file_record, parsed, embedding in parsed_files])
+    except Exception as e:
+        db.rollback()
+        if complete_resume_files(db, [file_record.id for file_record in file_records], ResumeFileStatus.failed):
+            db.commit()
+        else:
+            db.rollback()
+        return
+
+    for file_path in parsed_paths:
+        # Delete the file from storage
+        if os.path.exists(file_path):
+            os.remove(file_path)
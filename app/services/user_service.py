@@ -1,14 +1,19 @@
 from sqlalchemy.orm import Session
 from app.models.user import User, HROnboarding, UserOnboarding
-from app.schemas.user import UserCreate, HROnboardingCreate, UserOnboardingCreate
+from app.schemas.user import UserCreate, HROnboardingCreate, UserOnboardingCreate, CurrentUser
 from app.core.security import get_password_hash
+from app.core.config import settings
+from app.utils.ttl_cache import TTLCache
 from typing import Optional
 
+# Authenticated users by JWT subject (email)
+user_cache = TTLCache(max_size=settings.USER_CACHE_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+
 
 class UserService:
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
-        hashed_password = get_password_hash(user_data.password)
+    def create_user(db: Session, user_data: UserCreate, hashed_password: str = None) -> User:
+        hashed_password = hashed_password or get_password_hash(user_data.password)
         db_user = User(
             role=user_data.role,
             name=user_data.name,
@@ -19,12 +24,36 @@ class UserService:
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        UserService.invalidate_cached_user(db_user.email)
         return db_user
     
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
     
+    @staticmethod
+    def update_password_hash(db: Session, user: User, hashed_password: str):
+        db.query(User).filter(User.id == user.id).update({User.hashed_password: hashed_password})
+        db.commit()
+        user.hashed_password = hashed_password
+        UserService.invalidate_cached_user(user.email)
+
+    @staticmethod
+    def get_current_user(db: Session, email: str) -> Optional[CurrentUser]:
+        user = user_cache.get(email)
+        if user is None:
+            db_user = UserService.get_user_by_email(db, email)
+            if db_user is None:
+                return None
+            user = CurrentUser.model_validate(db_user)
+            user_cache.put(email, user)
+        return user
+
+    @staticmethod
+    def invalidate_cached_user(email: str):
+        # Call after any change to a user row so the next request reloads it
+        user_cache.invalidate(email)
+
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         return db.query(User).filter(User.id == user_id).first()
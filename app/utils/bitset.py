@@ -0,0 +1,71 @@
+from typing import Iterable, Iterator
+
+
+class Bitset:
+    """
+    Set of non-negative integers stored roaring-style as 65536-bit chunks.
+
+    Each chunk is a Python int keyed by the high bits of its values, so set
+    operations are C-level bitwise ops on the chunks both sides have, and an
+    update only ever copies one 8 KiB chunk.
+    """
+
+    CHUNK_BITS = 1 << 16
+    __slots__ = ("_chunks",)
+
+    def __init__(self, chunks: dict = None):
+        self._chunks: dict[int, int] = chunks or {}
+
+    def add(self, value: int):
+        high, low = divmod(value, self.CHUNK_BITS)
+        self._chunks[high] = self._chunks.get(high, 0) | (1 << low)
+
+    def update(self, values: Iterable[int]):
+        chunks = {}
+        for value in values:
+            high, low = divmod(value, self.CHUNK_BITS)
+            chunks[high] = chunks.get(high, 0) | (1 << low)
+        for high, chunk in chunks.items():
+            self._chunks[high] = self._chunks.get(high, 0) | chunk
+
+    def discard(self, value: int):
+        high, low = divmod(value, self.CHUNK_BITS)
+        chunk = self._chunks.get(high, 0) & ~(1 << low)
+        if chunk:
+            self._chunks[high] = chunk
+        else:
+            self._chunks.pop(high, None)
+
+    def __contains__(self, value: int) -> bool:
+        high, low = divmod(value, self.CHUNK_BITS)
+        return bool(self._chunks.get(high, 0) >> low & 1)
+
+    def __and__(self, other: "Bitset") -> "Bitset":
+        small, large = sorted((self._chunks, other._chunks), key=len)
+        chunks = {}
+        for high, chunk in small.items():
+            common = chunk & large.get(high, 0)
+            if common:
+                chunks[high] = common
+        return Bitset(chunks)
+
+    def __or__(self, other: "Bitset") -> "Bitset":
+        chunks = dict(self._chunks)
+        for high, chunk in other._chunks.items():
+            chunks[high] = chunks.get(high, 0) | chunk
+        return Bitset(chunks)
+
+    def __len__(self) -> int:
+        return sum(chunk.bit_count() for chunk in self._chunks.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._chunks):
+            chunk = self._chunks[high]
+            base = high * self.CHUNK_BITS
+            while chunk:
+                lowest = chunk & -chunk
+                yield base + lowest.bit_length() - 1
+                chunk ^= lowest
@@ -0,0 +1,170 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.resume import Resume, ResumeProject
+from app.utils.index_sync import SyncCursor
+
+# Keeps tokens like "c++", "c#" and "node.js" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+# English filler plus words that appear in nearly every resume or search
+# query. Left in, they match most documents and crowd out the real terms.
+# Single letters and "go" are deliberately absent, they are language names.
+STOP_WORDS = frozenset("""
+    a an and are as at be been but by can for from has have having i in into is it its me my of on or our
+    so than that the their them then there these they this those to was we were what when where which
+    who whom will with within without you your
+    candidate candidates experience experienced find looking need needs skills someone worked working
+    year years
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = (token.rstrip(".") for token in TOKEN_PATTERN.findall(text.casefold()))
+    return [token for token in tokens if token and token not in STOP_WORDS]
+
+
+def resume_terms(
+    technical_skills: Optional[Iterable[str]],
+    programming_languages: Optional[Iterable[str]],
+    project_technologies: Optional[Iterable[str]],
+    summary: Optional[str],
+) -> List[str]:
+    terms = []
+    for values in (technical_skills, programming_languages, project_technologies):
+        for value in values or []:
+            terms.extend(tokenize(value))
+    terms.extend(tokenize(summary or ""))
+    return terms
+
+
+class BM25Index:
+    """
+    In-memory inverted index over resume skills and summaries, scored with
+    Okapi BM25.
+
+    Postings are kept as ``term -> {resume_id: tf}`` so updates are cheap,
+    and each term's postings are frozen into numpy arrays the first time a
+    query touches them, so scoring never loops over documents in Python.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._arrays: dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._doc_len: dict[int, int] = {}
+        self._total_len = 0
+        self._cursor = SyncCursor()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def _remove_locked(self, resume_id: int):
+        counts = self._doc_terms.pop(resume_id, None)
+        if counts is None:
+            return
+        self._total_len -= self._doc_len.pop(resume_id)
+        for term in counts:
+            postings = self._postings[term]
+            postings.pop(resume_id, None)
+            if not postings:
+                del self._postings[term]
+            self._arrays.pop(term, None)
+
+    def _add_locked(self, resume_id: int, terms: List[str]):
+        self._remove_locked(resume_id)
+        counts = Counter(terms)
+        self._doc_terms[resume_id] = counts
+        self._doc_len[resume_id] = len(terms)
+        self._total_len += len(terms)
+        for term, tf in counts.items():
+            self._postings[term][resume_id] = tf
+            self._arrays.pop(term, None)
+
+    def add(self, resume_id: int, terms: List[str]):
+        with self._lock:
+            self._add_locked(resume_id, terms)
+
+    def remove(self, resume_id: int):
+        with self._lock:
+            self._remove_locked(resume_id)
+
+    def sync(self, db: Session):
+        """
+        Index resumes written since the last sync, e.g. by another replica.
+        """
+        pending = self._cursor.pending()
+        rows = (
+            db.query(Resume.id, Resume.technical_skills, Resume.programming_languages, Resume.summary)
+            .filter(pending.filter(Resume.id))
+            .order_by(Resume.id)
+            .all()
+        )
+        if not rows:
+            return
+        technologies = defaultdict(list)
+        for resume_id, project_technologies in (
+            db.query(ResumeProject.resume_id, ResumeProject.technologies).filter(pending.filter(ResumeProject.resume_id))
+        ):
+            technologies[resume_id].extend(project_technologies or [])
+        documents = [
+            (row.id, resume_terms(row.technical_skills, row.programming_languages, technologies[row.id], row.summary))
+            for row in rows
+        ]
+        with self._lock:
+            for resume_id, terms in documents:
+                self._add_locked(resume_id, terms)
+        self._cursor.advance(pending, [row.id for row in rows])
+
+    def _term_arrays(self, term: str):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            ids = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tfs = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            lengths = np.fromiter(map(self._doc_len.__getitem__, postings), dtype=np.float32, count=len(postings))
+            arrays = self._arrays[term] = (ids, tfs, lengths)
+        return arrays
+
+    def search(self, query: str, k: int = 100, resume_ids: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Top ``k`` resumes by BM25 score, optionally restricted to ``resume_ids``.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if not terms or doc_count == 0:
+                return []
+            avg_len = max(self._total_len / doc_count, 1.0)
+            matched_ids, matched_scores = [], []
+            for term in terms:
+                arrays = self._term_arrays(term)
+                if arrays is None:
+                    continue
+                ids, tfs, lengths = arrays
+                idf = math.log(1 + (doc_count - len(ids) + 0.5) / (len(ids) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * lengths / avg_len)
+                matched_ids.append(ids)
+                matched_scores.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not matched_ids:
+            return []
+        ids, inverse = np.unique(np.concatenate(matched_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(matched_scores))
+        if resume_ids is not None:
+            allowed = np.isin(ids, np.asarray(resume_ids, dtype=np.int64))
+            ids, scores = ids[allowed], scores[allowed]
+            if len(ids) == 0:
+                return []
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
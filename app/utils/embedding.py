@@ -1,10 +1,88 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
+from app.core.config import settings
+from app.services.embedding_service import embedding_service
+from app.utils.ttl_cache import TTLCache
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+EMBEDDING_DIM = 384
 
 def embed_text(text: str) -> np.ndarray:
-    return model.encode([text])[0]
+    return embedding_service.embed(text)
 
-def cosine_similarity(a, b):
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
\ No newline at end of file
+def encode_embedding(vector, dtype: str = None) -> bytes:
+    """
+    Pack an embedding for the ``Resume.embedding`` column.
+
+    float32 and float16 are stored raw. int8 is stored as a float32 scale
+    followed by the quantized values. The formats differ in length, so
+    ``to_vector`` can tell them apart without a header.
+    """
+    dtype = dtype or settings.EMBEDDING_STORAGE_DTYPE
+    vector = np.asarray(vector, dtype=np.float32)
+    if dtype == "float32":
+        return vector.tobytes()
+    if dtype == "float16":
+        return vector.astype(np.float16).tobytes()
+    if dtype == "int8":
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        return np.float32(scale).tobytes() + quantized.tobytes()
+    raise ValueError(f"Unknown embedding storage dtype: {dtype}")
+
+def to_vector(embedding) -> np.ndarray:
+    # Cross-compatible: handle both list (old JSONB) and packed bytes
+    if isinstance(embedding, list):
+        return np.array(embedding, dtype=np.float32)
+    size = len(embedding)
+    if size == EMBEDDING_DIM * 2:
+        return np.frombuffer(embedding, dtype=np.float16).astype(np.float32)
+    if size == EMBEDDING_DIM + 4:
+        scale = np.frombuffer(embedding, dtype=np.float32, count=1)[0]
+        return np.frombuffer(embedding, dtype=np.int8, offset=4).astype(np.float32) * scale
+    return np.frombuffer(embedding, dtype=np.float32)
+
+
+class QueryEmbeddingCache(TTLCache):
+    """
+    TTLCache of query embeddings that counts hits and misses.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        super().__init__(max_size, ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # The MiniLM tokenizer is uncased, so casing and spacing do not change the vector
+        return " ".join(text.split()).casefold()
+
+    def get(self, key):
+        vector = super().get(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return vector
+
+    def put(self, key, vector: np.ndarray):
+        vector.setflags(write=False)
+        super().put(key, vector)
+
+    def stats(self) -> dict:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses}
+
+
+query_cache = QueryEmbeddingCache(
+    max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+def embed_query(text: str) -> np.ndarray:
+    normalized = QueryEmbeddingCache.normalize(text)
+    key = (settings.EMBEDDING_MODEL_NAME, settings.EMBEDDING_BACKEND, normalized)
+    vector = query_cache.get(key)
+    if vector is None:
+        vector = np.asarray(embed_text(normalized), dtype=np.float32)
+        query_cache.put(key, vector)
+    return vector
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, NamedTuple
+from sqlalchemy import or_
+from app.core.config import settings
+
+
+class PendingIds(NamedTuple):
+    """
+    Resume ids a sync still has to look at, everything above ``last_id``
+    plus the ``gaps`` below it.
+    """
+
+    last_id: int
+    gaps: FrozenSet[int]
+
+    def filter(self, column):
+        if not self.gaps:
+            return column > self.last_id
+        return or_(column > self.last_id, column.in_(self.gaps))
+
+
+class SyncCursor:
+    """
+    Tracks which resume ids an index has already read from the database.
+
+    Ids are assigned at INSERT but become visible at COMMIT, so a lower id
+    from another writer can appear after a higher one was synced. Ids
+    skipped below the high-water mark are kept as gaps and queried again on
+    every sync until they show up or ``gap_seconds`` pass, after which they
+    are taken to be rolled back or deleted. Only the ``gap_window`` ids
+    below the newest one are tracked as gaps.
+    """
+
+    def __init__(self, gap_seconds: float = None, gap_window: int = None):
+        self.gap_seconds = settings.INDEX_SYNC_GAP_SECONDS if gap_seconds is None else gap_seconds
+        self.gap_window = settings.INDEX_SYNC_GAP_WINDOW if gap_window is None else gap_window
+        self.last_id = 0
+        self._gaps: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def pending(self) -> PendingIds:
+        with self._lock:
+            now = time.monotonic()
+            for gap in [gap for gap, since in self._gaps.items() if now - since > self.gap_seconds]:
+                del self._gaps[gap]
+            return PendingIds(self.last_id, frozenset(self._gaps))
+
+    def advance(self, pending: PendingIds, seen_ids: Iterable[int]):
+        """
+        Record the ids returned by a query filtered with ``pending``.
+        """
+        seen = set(seen_ids)
+        with self._lock:
+            for resume_id in seen:
+                self._gaps.pop(resume_id, None)
+            newest = max(seen, default=0)
+            if newest <= self.last_id:
+                return
+            now = time.monotonic()
+            start = max(self.last_id, pending.last_id, newest - self.gap_window) + 1
+            for resume_id in range(start, newest):
+                if resume_id not in seen:
+                    self._gaps.setdefault(resume_id, now)
+            self.last_id = newest
+
+    def restore(self, last_id: int, gaps: Iterable[int]):
+        """
+        Continue from a persisted position, e.g. an index snapshot.
+        """
+        with self._lock:
+            if last_id <= self.last_id:
+                return
+            now = time.monotonic()
+            self.last_id = last_id
+            for gap in gaps:
+                self._gaps.setdefault(gap, now)
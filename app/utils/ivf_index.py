@@ -0,0 +1,287 @@
+from contextlib import contextmanager
+import fcntl
+import json
+import os
+import shutil
+import threading
+from typing import List, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.resume import Resume
+from app.utils.embedding import EMBEDDING_DIM, to_vector
+from app.utils.index_sync import PendingIds, SyncCursor
+from app.utils.vector_index import VectorIndex
+
+
+def train_kmeans(
+    vectors: np.ndarray, nlist: int, iterations: int = 15, max_points_per_list: int = 64, seed: int = 0
+) -> np.ndarray:
+    """
+    Spherical k-means over L2-normalised rows, returns normalised centroids.
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > nlist * max_points_per_list:
+        vectors = vectors[rng.choice(len(vectors), nlist * max_points_per_list, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign_lists(vectors, centroids)
+        counts = np.bincount(assignments, minlength=nlist)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(vectors[np.argsort(assignments, kind="stable")], starts[nonempty], axis=0)
+        empty = ~nonempty
+        if empty.any():
+            # Re-seed empty lists from random points so every list stays useful
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk):
+        assignments[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFIndex:
+    """
+    Inverted-file ANN index with k-means centroids and an on-disk snapshot.
+
+    The snapshot stores vectors grouped by list, so a query only touches the
+    ``nprobe`` closest lists. It is attached with ``np.load(mmap_mode="r")``,
+    which lets a restarted process serve queries straight from the page cache.
+    Inserts since the last snapshot live in an in-memory ``VectorIndex`` tail
+    and are folded into a new snapshot once the tail grows large enough.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dim: int = EMBEDDING_DIM,
+        nlist: int = 256,
+        nprobe: int = 16,
+        min_train_size: int = 1000,
+        rebuild_ratio: float = 0.1,
+    ):
+        self.path = path
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.rebuild_ratio = rebuild_ratio
+        self._centroids = np.zeros((0, dim), dtype=np.float32)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._id_order = np.zeros(0, dtype=np.int64)
+        self._sorted_ids = np.zeros(0, dtype=np.int64)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._tail = VectorIndex(dim=dim)
+        self._deleted: set[int] = set()
+        self._cursor = SyncCursor()
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self.load()
+
+    @contextmanager
+    def _snapshot_lock(self, shared: bool = False):
+        # Replicas and workers share IVF_INDEX_PATH, the flock keeps a reader from seeing a half-swapped snapshot
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self):
+        with self._snapshot_lock(shared=True):
+            if not os.path.exists(os.path.join(self.path, "meta.json")):
+                return
+            with self._lock:
+                self._attach()
+
+    def _attach(self):
+        with open(os.path.join(self.path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim:
+            return
+        self._centroids = np.load(os.path.join(self.path, "centroids.npy"))
+        self._offsets = np.load(os.path.join(self.path, "offsets.npy"))
+        self._ids = np.load(os.path.join(self.path, "ids.npy"), mmap_mode="r")
+        self._vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+        # Snapshot rows are grouped by list, this sorts them by id for score()
+        self._id_order = np.argsort(self._ids, kind="stable")
+        self._sorted_ids = np.asarray(self._ids)[self._id_order]
+        self._cursor.restore(meta["last_id"], meta.get("gaps", []))
+
+    def _find_base(self, resume_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Binary search ``resume_ids`` in the snapshot, returns their positions
+        in ``_sorted_ids`` and a mask of the ones that are present.
+        """
+        if not len(self._sorted_ids):
+            return np.zeros(len(resume_ids), dtype=np.int64), np.zeros(len(resume_ids), dtype=bool)
+        found = np.minimum(np.searchsorted(self._sorted_ids, resume_ids), len(self._sorted_ids) - 1)
+        return found, self._sorted_ids[found] == resume_ids
+
+    def _tombstone_base(self, resume_ids: List[int]):
+        # Base rows are immutable, so superseded or removed ones are masked out
+        _, in_base = self._find_base(np.asarray(resume_ids, dtype=np.int64))
+        self._deleted.update(resume_id for resume_id, found in zip(resume_ids, in_base) if found)
+
+    def add(self, resume_id: int, embedding):
+        with self._lock:
+            self._tombstone_base([resume_id])
+            self._tail.add(resume_id, embedding)
+        self._maybe_rebuild()
+
+    def remove(self, resume_id: int):
+        with self._lock:
+            self._tail.remove(resume_id)
+            self._deleted.add(resume_id)
+
+    def sync(self, db: Session):
+        """
+        Load embeddings written since the snapshot or the last sync.
+        """
+        pending = self._cursor.pending()
+        rows = db.query(Resume.id, Resume.embedding).filter(pending.filter(Resume.id)).order_by(Resume.id).all()
+        if not rows:
+            return
+        rows_with_embedding = [row for row in rows if row.embedding is not None]
+        with self._lock:
+            self._tombstone_base([row.id for row in rows_with_embedding])
+            for resume_id, embedding in rows_with_embedding:
+                self._tail.add(resume_id, to_vector(embedding))
+        self._cursor.advance(pending, [row.id for row in rows])
+        self._maybe_rebuild()
+
+    def _search_base(self, query_vec: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if len(self._ids) == 0:
+            return []
+        nprobe = min(self.nprobe, len(self._centroids))
+        probe = np.argpartition(-(self._centroids @ query_vec), nprobe - 1)[:nprobe]
+        ranges = [(self._offsets[c], self._offsets[c + 1]) for c in probe]
+        ids = np.concatenate([self._ids[start:end] for start, end in ranges])
+        if len(ids) == 0:
+            return []
+        scores = np.concatenate([self._vectors[start:end] @ query_vec for start, end in ranges])
+        if self._deleted:
+            live = ~np.isin(ids, np.fromiter(self._deleted, dtype=np.int64))
+            ids, scores = ids[live], scores[live]
+            if len(ids) == 0:
+                return []
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def search(self, db: Session, query, k: int = 10) -> List[Tuple[int, float]]:
+        query_vec = self._tail._normalize(query)
+        with self._lock:
+            candidates = self._search_base(query_vec, k) + self._tail.search(db, query_vec, k)
+        candidates.sort(key=lambda match: match[1], reverse=True)
+        return candidates[:k]
+
+    def score(self, db: Session, query, resume_ids: List[int]) -> List[Tuple[int, float]]:
+        """
+        Exact cosine similarity of the query to each of ``resume_ids`` that is indexed.
+        """
+        query_vec = self._tail._normalize(query)
+        scored = dict(self._tail.score(db, query_vec, resume_ids))
+        with self._lock:
+            wanted = np.asarray(
+                [resume_id for resume_id in resume_ids if resume_id not in scored and resume_id not in self._deleted],
+                dtype=np.int64,
+            )
+            found, hit = self._find_base(wanted)
+            if hit.any():
+                rows = np.sort(self._id_order[found[hit]])
+                scores = np.asarray(self._vectors[rows]) @ query_vec
+                scored.update(zip(self._ids[rows].tolist(), scores.tolist()))
+        return [(resume_id, scored[resume_id]) for resume_id in resume_ids if resume_id in scored]
+
+    def _maybe_rebuild(self):
+        with self._lock:
+            base_size = len(self._ids)
+            tail_size = len(self._tail)
+            if base_size == 0:
+                due = tail_size >= self.min_train_size
+            else:
+                due = tail_size >= max(self.min_train_size, int(base_size * self.rebuild_ratio))
+            if not due or self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self.rebuild, daemon=True).start()
+
+    def rebuild(self):
+        """
+        Retrain centroids over every live vector and write a new snapshot.
+        """
+        try:
+            # Only sync() moves the cursor, add() does not. Catch up first so the snapshot's last_id covers
+            # what it holds, otherwise a process that only adds (the worker) saves a position that makes
+            # every restart re-read all embeddings
+            db = SessionLocal()
+            try:
+                self.sync(db)
+            except Exception as e:
+                # A stale position is still safe, it only means more rows are re-read after a restart
+                print(e)
+            finally:
+                db.close()
+            with self._lock:
+                live = ~np.isin(self._ids, np.fromiter(self._deleted, dtype=np.int64))
+                tail_size = len(self._tail)
+                tail_ids = self._tail._ids[:tail_size].copy()
+                ids = np.concatenate([np.asarray(self._ids)[live], tail_ids])
+                vectors = np.concatenate([np.asarray(self._vectors)[live], self._tail._vectors[:tail_size]])
+                deleted = set(self._deleted)
+                position = self._cursor.pending()
+            if len(ids) == 0:
+                return
+
+            nlist = max(1, min(self.nlist, int(np.sqrt(len(ids)))))
+            centroids = train_kmeans(vectors, nlist)
+            assignments = assign_lists(vectors, centroids)
+            order = np.argsort(assignments, kind="stable")
+            offsets = np.zeros(nlist + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(np.bincount(assignments, minlength=nlist))
+            with self._snapshot_lock():
+                self._write_snapshot(centroids, offsets, ids[order], vectors[order], position)
+                with self._lock:
+                    self._attach()
+                    # Keep removals and inserts that happened while the snapshot was being built
+                    self._deleted -= deleted
+                    for resume_id in tail_ids.tolist():
+                        self._tail.remove(resume_id)
+                    self._tombstone_base(self._tail._ids[:len(self._tail)].tolist())
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _write_snapshot(self, centroids, offsets, ids, vectors, position: PendingIds):
+        """
+        Write the snapshot next to ``path`` and swap it in, under ``_snapshot_lock``.
+        """
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        old_path = f"{self.path}.old-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, "centroids.npy"), centroids)
+        np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+        np.save(os.path.join(tmp_path, "ids.npy"), ids)
+        np.save(os.path.join(tmp_path, "vectors.npy"), np.ascontiguousarray(vectors, dtype=np.float32))
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            # Gaps are saved too, so a restart still picks up rows that commit late
+            json.dump(
+                {"dim": self.dim, "count": int(len(ids)), "last_id": position.last_id, "gaps": sorted(position.gaps)}, f
+            )
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.rename(self.path, old_path)
+        os.rename(tmp_path, self.path)
+        shutil.rmtree(old_path, ignore_errors=True)
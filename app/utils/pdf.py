@@ -0,0 +1,14 @@
+from pypdf import PdfReader
+
+
+def extract_resume_text(file) -> str:
+    # Accepts a path or a binary file object. Runs in the spawned PDF pool, so keep this module's imports
+    # to pypdf: every child imports it to unpickle the call
+    reader = PdfReader(file)
+
+    resumeContent = ""
+
+    for page in reader.pages:
+        resumeContent += page.extract_text() + "\n\n"
+
+    return resumeContent
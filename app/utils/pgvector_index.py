@@ -0,0 +1,101 @@
+from typing import Iterable, List, Tuple
+import numpy as np
+from sqlalchemy import case, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.resume import Resume
+from app.models.resume_embedding import ResumeEmbedding
+from app.utils.embedding import to_vector
+from app.utils.index_sync import SyncCursor
+
+
+class PgVectorIndex:
+    """
+    Resume index backed by a pgvector column with an HNSW index.
+
+    Ranking happens in Postgres (``ORDER BY embedding <=> :q LIMIT k``), so
+    nothing is held in process memory apart from a sync cursor.
+    """
+
+    def __init__(self):
+        self._cursor = SyncCursor()
+
+    def _upsert(self, db: Session, rows: List[dict]):
+        stmt = insert(ResumeEmbedding).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResumeEmbedding.resume_id],
+            set_={"embedding": stmt.excluded.embedding},
+        )
+        db.execute(stmt)
+
+    def add_many(self, db: Session, rows: Iterable[Tuple[int, object]]):
+        """
+        Upsert ``(resume_id, embedding)`` rows with one statement on ``db``.
+        Nothing is committed, the vectors land with the caller's transaction.
+        """
+        rows = [{"resume_id": resume_id, "embedding": np.asarray(embedding, dtype=np.float32)} for resume_id, embedding in rows]
+        if rows:
+            self._upsert(db, rows)
+
+    def add(self, resume_id: int, embedding):
+        db = SessionLocal()
+        try:
+            self.add_many(db, [(resume_id, embedding)])
+            db.commit()
+        finally:
+            db.close()
+
+    def remove(self, resume_id: int):
+        db = SessionLocal()
+        try:
+            db.query(ResumeEmbedding).filter(ResumeEmbedding.resume_id == resume_id).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def sync(self, db: Session):
+        """
+        Backfill vectors for resumes whose embedding was written without one.
+        """
+        pending = self._cursor.pending()
+        # Every pending id counts as seen, the embedding is only fetched where the vector is missing
+        missing = case((ResumeEmbedding.resume_id == None, Resume.embedding))
+        rows = (
+            db.query(Resume.id, missing)
+            .outerjoin(ResumeEmbedding, ResumeEmbedding.resume_id == Resume.id)
+            .filter(pending.filter(Resume.id))
+            .order_by(Resume.id)
+            .all()
+        )
+        backfill = [
+            {"resume_id": resume_id, "embedding": to_vector(embedding)} for resume_id, embedding in rows if embedding is not None
+        ]
+        if backfill:
+            self._upsert(db, backfill)
+            db.commit()
+        self._cursor.advance(pending, [row.id for row in rows])
+
+    def search(self, db: Session, query, k: int = 10, where: list = None) -> List[Tuple[int, float]]:
+        """
+        Nearest resumes by cosine distance. ``where`` holds predicates on
+        ``Resume`` that are applied inside the same HNSW scan.
+        """
+        query_vec = np.asarray(query, dtype=np.float32)
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.PGVECTOR_EF_SEARCH)}"))
+        distance = ResumeEmbedding.embedding.cosine_distance(query_vec)
+        rows = db.query(ResumeEmbedding.resume_id, distance)
+        if where:
+            if settings.PGVECTOR_ITERATIVE_SCAN:
+                # Keep scanning the graph until k rows pass the filters, otherwise only ef_search candidates are checked
+                db.execute(text(f"SET LOCAL hnsw.iterative_scan = {settings.PGVECTOR_ITERATIVE_SCAN}"))
+            rows = rows.join(Resume, Resume.id == ResumeEmbedding.resume_id).filter(*where)
+        rows = rows.order_by(distance).limit(k).all()
+        return [(resume_id, 1.0 - float(dist)) for resume_id, dist in rows]
+
+    def score(self, db: Session, query, resume_ids: List[int]) -> List[Tuple[int, float]]:
+        query_vec = np.asarray(query, dtype=np.float32)
+        distance = ResumeEmbedding.embedding.cosine_distance(query_vec)
+        rows = db.query(ResumeEmbedding.resume_id, distance).filter(ResumeEmbedding.resume_id.in_(resume_ids)).all()
+        return [(resume_id, 1.0 - float(dist)) for resume_id, dist in rows]
@@ -0,0 +1,33 @@
+import hashlib
+import json
+from typing import Optional, Tuple
+from app.utils.ttl_cache import TTLCache
+
+
+class ResponseCache(TTLCache):
+    """
+    TTLCache of JSON response bodies.
+
+    Each body is stored as ``(etag, payload)`` with a strong ETag derived
+    from its content, so unchanged responses can be answered with
+    ``304 Not Modified``.
+    """
+
+    @staticmethod
+    def make_etag(payload: dict) -> str:
+        body = json.dumps(payload, sort_keys=True, default=str).encode()
+        return f'"{hashlib.sha1(body).hexdigest()}"'
+
+    def put(self, key, payload: dict) -> Tuple[str, dict]:
+        entry = (self.make_etag(payload), payload)
+        super().put(key, entry)
+        return entry
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
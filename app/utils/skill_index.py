@@ -0,0 +1,286 @@
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.resume import Resume, ResumeProject
+from app.models.skill import Skill, SkillAlias
+from app.utils.bitset import Bitset
+from app.utils.index_sync import SyncCursor
+
+# Applied after normalize_skill, entries in the skill_aliases table take precedence
+BUILTIN_SKILL_ALIASES = {
+    "reactjs": "react",
+    "vuejs": "vue",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "amazonwebservices": "aws",
+    "gcp": "googlecloud",
+    "googlecloudplatform": "googlecloud",
+    "ml": "machinelearning",
+    "csharp": "c#",
+    "cpp": "c++",
+}
+
+
+def normalize_skill(raw: str) -> str:
+    # "React.js", "react js" and "ReactJS" all become "reactjs", "+" and "#" are kept for c++ and c#
+    return re.sub(r"[^a-z0-9+#]", "", raw.casefold())
+
+
+class SkillVocabulary:
+    """
+    Maps free-text skill strings to stable ids from the ``skills`` table.
+
+    A string is normalised, then resolved through ``skill_aliases`` and the
+    built-in aliases. Unknown skills are inserted when a resume is ingested.
+    Skills and aliases are read once per process.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._aliases: Dict[str, int] = {}
+        # Raw strings seen per skill id, for filters that have to run in SQL
+        self._spellings: Dict[int, set] = defaultdict(set)
+        # Keys known to be in the skills or skill_aliases table
+        self._persisted: set = set()
+        self._next_local_id = -1
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load_locked(self):
+        if self._loaded:
+            return
+        db = SessionLocal()
+        try:
+            self._ids.update({key: skill_id for skill_id, key in db.query(Skill.id, Skill.key)})
+            self._aliases.update({alias: skill_id for alias, skill_id in db.query(SkillAlias.alias, SkillAlias.skill_id)})
+        finally:
+            db.close()
+        self._persisted.update(self._ids)
+        self._persisted.update(self._aliases)
+        self._loaded = True
+
+    def _find_locked(self, raw: str):
+        key = normalize_skill(raw)
+        if not key:
+            return None, None
+        if key in self._aliases:
+            return key, self._aliases[key]
+        key = BUILTIN_SKILL_ALIASES.get(key, key)
+        return key, self._aliases.get(key, self._ids.get(key))
+
+    def lookup(self, raw: str) -> Optional[int]:
+        with self._lock:
+            self._load_locked()
+            return self._find_locked(raw)[1]
+
+    def resolve(self, raw_names: Iterable[str], create: bool = True) -> Dict[str, int]:
+        """
+        Skill id for every non-empty name.
+
+        With ``create`` (ingest), skills missing from the ``skills`` table are
+        inserted outside the lock, ON CONFLICT DO NOTHING so concurrent writers
+        agree on one id. Without it (the search path) nothing is queried:
+        names this process has not seen get a process-local negative id, which
+        is all the in-memory bitsets need.
+        """
+        raw_names = set(raw_names)
+        if create:
+            with self._lock:
+                self._load_locked()
+                unsaved = {}
+                for raw in raw_names:
+                    key = self._find_locked(raw)[0]
+                    if key and key not in self._persisted:
+                        unsaved.setdefault(key, raw)
+            if unsaved:
+                saved = self._save(unsaved)
+                with self._lock:
+                    self._persisted.update(saved)
+                    for key, skill_id in saved.items():
+                        # A key given a local id earlier keeps it, bitsets already use that id
+                        self._ids.setdefault(key, skill_id)
+        with self._lock:
+            self._load_locked()
+            resolved = {}
+            for raw in raw_names:
+                key, skill_id = self._find_locked(raw)
+                if not key:
+                    continue
+                if skill_id is None:
+                    skill_id = self._ids[key] = self._next_local_id
+                    self._next_local_id -= 1
+                resolved[raw] = skill_id
+                self._spellings[skill_id].add(raw)
+            return resolved
+
+    @staticmethod
+    def _save(names_by_key: Dict[str, str]) -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            db.execute(
+                insert(Skill)
+                .values([{"key": key, "name": name} for key, name in names_by_key.items()])
+                .on_conflict_do_nothing(index_elements=[Skill.key])
+            )
+            db.commit()
+            return {key: skill_id for key, skill_id in db.query(Skill.key, Skill.id).filter(Skill.key.in_(names_by_key))}
+        finally:
+            db.close()
+
+    def spellings(self, raw: str) -> List[str]:
+        """
+        Every stored string known to mean the same skill as ``raw``, e.g.
+        "React", "ReactJS" and "react.js". Only strings passed to ``resolve``
+        are known, which after a SkillIndex sync is every one in the table.
+        """
+        with self._lock:
+            self._load_locked()
+            skill_id = self._find_locked(raw)[1]
+            return sorted(self._spellings.get(skill_id, set()) | {raw})
+
+
+# Source fields a resume's skills are indexed under, each gets its own bitsets
+SKILL_FIELDS = ("technical_skills", "programming_languages", "project_technologies")
+
+
+class SkillIndex:
+    """
+    In-memory bitset per (field, skill id) over resume ids.
+
+    "Skills A and B, languages C, any of D or E" is an AND of three bitsets
+    with the OR of the D and E bitsets across every field, so skill filters
+    never touch the resumes table. ``total_experience`` is kept alongside in
+    a numpy array indexed by resume id, so the experience filter is one
+    vectorised comparison instead of a query.
+    """
+
+    def __init__(self, vocabulary: SkillVocabulary):
+        self.vocabulary = vocabulary
+        self._bitsets: Dict[Tuple[str, int], Bitset] = defaultdict(Bitset)
+        self._resume_skills: Dict[int, set] = {}
+        # -inf for unknown experience, it fails every ">=" comparison
+        self._experience = np.full(1024, -np.inf, dtype=np.float32)
+        self._cursor = SyncCursor()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._resume_skills)
+
+    def _remove_locked(self, resume_id: int):
+        for key in self._resume_skills.pop(resume_id, ()):
+            self._bitsets[key].discard(resume_id)
+        if resume_id < len(self._experience):
+            self._experience[resume_id] = -np.inf
+
+    def _add_locked(self, resume_id: int, keys: set, total_experience: Optional[float]):
+        self._remove_locked(resume_id)
+        self._resume_skills[resume_id] = keys
+        for key in keys:
+            self._bitsets[key].add(resume_id)
+        if resume_id >= len(self._experience):
+            grown = np.full(max(resume_id + 1, 2 * len(self._experience)), -np.inf, dtype=np.float32)
+            grown[:len(self._experience)] = self._experience
+            self._experience = grown
+        self._experience[resume_id] = -np.inf if total_experience is None else total_experience
+
+    @staticmethod
+    def _keys(skills_by_field: Dict[str, List[str]], resolved: Dict[str, int]) -> set:
+        return {
+            (field, resolved[raw]) for field, raw_skills in skills_by_field.items() for raw in raw_skills if raw in resolved
+        }
+
+    def add(self, resume_id: int, skills_by_field: Dict[str, List[str]], total_experience: Optional[float] = None):
+        resolved = self.vocabulary.resolve(raw for raw_skills in skills_by_field.values() for raw in raw_skills)
+        with self._lock:
+            self._add_locked(resume_id, self._keys(skills_by_field, resolved), total_experience)
+
+    def remove(self, resume_id: int):
+        with self._lock:
+            self._remove_locked(resume_id)
+
+    def sync(self, db: Session):
+        """
+        Index resumes written since the last sync, e.g. by another replica.
+        """
+        pending = self._cursor.pending()
+        rows = (
+            db.query(Resume.id, Resume.technical_skills, Resume.programming_languages, Resume.total_experience)
+            .filter(pending.filter(Resume.id))
+            .order_by(Resume.id)
+            .all()
+        )
+        if not rows:
+            return
+        documents = {
+            row.id: {
+                "technical_skills": row.technical_skills or [],
+                "programming_languages": row.programming_languages or [],
+                "project_technologies": [],
+            }
+            for row in rows
+        }
+        for resume_id, technologies in (
+            db.query(ResumeProject.resume_id, ResumeProject.technologies).filter(pending.filter(ResumeProject.resume_id))
+        ):
+            if resume_id in documents:
+                documents[resume_id]["project_technologies"].extend(technologies or [])
+        # Runs on the search path, so no writes here: new skills were stored by whoever ingested the resume
+        resolved = self.vocabulary.resolve(
+            (raw for skills_by_field in documents.values() for raw_skills in skills_by_field.values() for raw in raw_skills),
+            create=False,
+        )
+        with self._lock:
+            for row in rows:
+                self._add_locked(row.id, self._keys(documents[row.id], resolved), row.total_experience)
+        self._cursor.advance(pending, [row.id for row in rows])
+
+    def match(self, all_of: Dict[str, List[str]] = None, any_of: List[str] = ()) -> Bitset:
+        """
+        Resume ids listing, for each field in ``all_of``, every skill given for
+        it, and if ``any_of`` is given at least one of those in any field.
+        """
+        all_keys = [(field, self.vocabulary.lookup(raw)) for field, raw_skills in (all_of or {}).items() for raw in raw_skills]
+        any_ids = [skill_id for skill_id in (self.vocabulary.lookup(raw) for raw in any_of) if skill_id is not None]
+        if any(skill_id is None for _, skill_id in all_keys) or (any_of and not any_ids):
+            return Bitset()
+        with self._lock:
+            matched = None
+            for key in all_keys:
+                bitset = self._bitsets.get(key, Bitset())
+                matched = bitset if matched is None else matched & bitset
+            if any_ids:
+                either = Bitset()
+                for skill_id in any_ids:
+                    for field in SKILL_FIELDS:
+                        either = either | self._bitsets.get((field, skill_id), Bitset())
+                matched = either if matched is None else matched & either
+            # Copy so later updates cannot leak into the caller's result
+            return (matched or Bitset()) | Bitset()
+
+    def with_experience(self, min_experience: float, within: Bitset = None) -> Optional[List[int]]:
+        """
+        Ids, optionally among ``within``, with at least ``min_experience`` years.
+        Returns None when that is every indexed resume, i.e. no restriction.
+        """
+        with self._lock:
+            if within is None:
+                ids = np.flatnonzero(self._experience >= min_experience)
+                if len(ids) == len(self._resume_skills):
+                    return None
+            else:
+                ids = np.fromiter(within, dtype=np.int64, count=len(within))
+                ids = ids[ids < len(self._experience)]
+                ids = ids[self._experience[ids] >= min_experience]
+        return ids.tolist()
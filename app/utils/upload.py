@@ -0,0 +1,45 @@
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from typing import Tuple
+from app.core.config import settings
+import hashlib
+
+PDF_MAGIC = b"%PDF-"
+
+
+async def save_pdf_upload(file: UploadFile, file_path: str, max_bytes: int) -> Tuple[int, str]:
+    """
+    Stream an uploaded PDF to disk chunk by chunk, returns its size and SHA-256.
+
+    File writes run in the thread pool so the event loop is never blocked, and
+    non-PDFs are rejected from their first bytes before anything is written.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    chunk = b""
+    # Keep reading until the magic can be checked, whatever UPLOAD_CHUNK_BYTES is
+    while len(chunk) < len(PDF_MAGIC):
+        more = await file.read(settings.UPLOAD_CHUNK_BYTES)
+        if not more:
+            break
+        chunk += more
+    if not chunk.startswith(PDF_MAGIC):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"{file.filename} is not a PDF"
+        )
+    f = await run_in_threadpool(open, file_path, "wb")
+    try:
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"{file.filename} exceeds the upload size limit"
+                )
+            digest.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+            chunk = await file.read(settings.UPLOAD_CHUNK_BYTES)
+    finally:
+        await run_in_threadpool(f.close)
+    return size, digest.hexdigest()
@@ -0,0 +1,116 @@
+import threading
+from typing import List, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.resume import Resume
+from app.utils.embedding import EMBEDDING_DIM, to_vector
+from app.utils.index_sync import SyncCursor
+
+
+class VectorIndex:
+    """
+    Resident cosine-similarity index over resume embeddings.
+
+    Vectors are L2-normalised on insert and kept in one contiguous float32
+    matrix with a parallel array of resume ids, so a query is a single
+    matrix-vector product followed by ``argpartition``.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, capacity: int = 1024):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._positions: dict[int, int] = {}
+        self._size = 0
+        self._cursor = SyncCursor()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _normalize(self, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dim:
+            raise ValueError(f"Expected embedding of size {self.dim}, got {vector.shape[0]}")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _grow(self, needed: int):
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._vectors, self._ids = vectors, ids
+
+    def _add_locked(self, resume_id: int, vector: np.ndarray):
+        row = self._positions.get(resume_id)
+        if row is None:
+            self._grow(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._positions[resume_id] = row
+            self._ids[row] = resume_id
+        self._vectors[row] = vector
+
+    def add(self, resume_id: int, embedding):
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._add_locked(resume_id, vector)
+
+    def remove(self, resume_id: int):
+        with self._lock:
+            row = self._positions.pop(resume_id, None)
+            if row is None:
+                return
+            last = self._size - 1
+            if row != last:
+                # Move the last row into the hole to keep the matrix contiguous
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = self._ids[last]
+                self._positions[int(self._ids[row])] = row
+            self._size = last
+
+    def sync(self, db: Session):
+        """
+        Load embeddings written since the last sync, e.g. by another replica.
+        """
+        pending = self._cursor.pending()
+        rows = db.query(Resume.id, Resume.embedding).filter(pending.filter(Resume.id)).order_by(Resume.id).all()
+        if not rows:
+            return
+        vectors = [
+            (resume_id, self._normalize(to_vector(embedding))) for resume_id, embedding in rows if embedding is not None
+        ]
+        with self._lock:
+            for resume_id, vector in vectors:
+                self._add_locked(resume_id, vector)
+        # Only sync moves the cursor, rows added directly may have skipped ahead of it
+        self._cursor.advance(pending, [row.id for row in rows])
+
+    def search(self, db: Session, query, k: int = 10) -> List[Tuple[int, float]]:
+        query_vec = self._normalize(query)
+        with self._lock:
+            if self._size == 0:
+                return []
+            scores = self._vectors[:self._size] @ query_vec
+            k = min(k, self._size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self._ids[i]), float(scores[i])) for i in top]
+
+    def score(self, db: Session, query, resume_ids: List[int]) -> List[Tuple[int, float]]:
+        """
+        Cosine similarity of the query to each of ``resume_ids`` that is indexed.
+        """
+        query_vec = self._normalize(query)
+        with self._lock:
+            known = [(resume_id, self._positions[resume_id]) for resume_id in resume_ids if resume_id in self._positions]
+            if not known:
+                return []
+            scores = self._vectors[[row for _, row in known]] @ query_vec
+        return [(resume_id, float(score)) for (resume_id, _), score in zip(known, scores)]
@@ -0,0 +1,64 @@
+from app.core.config import settings
+import select
+import threading
+import time
+
+# Everything heavier is imported inside the functions. The PDF pool uses spawn, and under
+# `python -m app.worker` each child re-imports this module as __mp_main__; a top-level
+# resume_service import would load torch and the search indexes in every PDF worker.
+
+
+def listen_for_resume_files():
+    """
+    Relay Postgres NOTIFYs from uploads on any replica to the local wakeup event.
+    """
+    import psycopg2
+    from app.core.database import libpq_dsn
+    from app.services.resume_service import resume_files_ready, RESUME_FILES_CHANNEL
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(libpq_dsn(settings.DATABASE_URL))
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f"LISTEN {RESUME_FILES_CHANNEL}")
+            # Catch anything uploaded while we were not listening
+            resume_files_ready.set()
+            while True:
+                if select.select([conn], [], [], settings.RESUME_POLL_INTERVAL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                if conn.notifies:
+                    conn.notifies.clear()
+                    resume_files_ready.set()
+        except Exception as e:
+            print(e)
+            time.sleep(5)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def resume_processing_worker():
+    from app.core.database import SessionLocal
+    from app.services.resume_service import process_pending_resumes, resume_files_ready
+    threading.Thread(target=listen_for_resume_files, name="resume-files-listener", daemon=True).start()
+    while True:
+        # Polling is only a fallback, uploads wake the worker straight away
+        resume_files_ready.wait(timeout=settings.RESUME_POLL_INTERVAL_SECONDS)
+        resume_files_ready.clear()
+        db = SessionLocal()
+        try:
+            process_pending_resumes(db)
+        except Exception as e:
+            # Claimed files go back to the queue when their lease expires, the worker itself must keep running
+            print(e)
+            db.rollback()
+            time.sleep(5)
+            resume_files_ready.set()
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    # Dedicated worker process: python -m app.worker
+    resume_processing_worker()
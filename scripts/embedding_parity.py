@@ -0,0 +1,110 @@
+"""
+Compare the ONNX embedding backends against the torch reference.
+
+Encodes a fixed set of resume snippets and search queries with every
+backend and reports, relative to torch:
+
+- the mean and worst cosine similarity between each text's two embeddings
+- how many of each query's top 5 resumes are the same
+- median single-query latency and batched throughput
+
+Run from the repository root, ONNX backends need requirements-onnx.txt:
+
+    python -m scripts.embedding_parity --backends torch onnx onnx-int8
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+from app.core.config import settings
+from app.services.embedding_service import load_embedding_model
+
+RESUMES = [
+    "Senior backend engineer, 8 years of Python, Django and PostgreSQL, led the payments platform migration",
+    "Frontend developer with React, TypeScript and Redux, built design systems for e-commerce storefronts",
+    "Data scientist working on churn prediction with scikit-learn, XGBoost and Spark on AWS EMR",
+    "DevOps engineer running Kubernetes clusters on GCP, Terraform, Helm charts and Prometheus alerting",
+    "Android developer, Kotlin and Jetpack Compose, shipped a banking app used by two million customers",
+    "iOS engineer with Swift and SwiftUI, offline-first sync and Core Data performance tuning",
+    "Machine learning engineer, PyTorch, transformer fine-tuning and model serving with Triton",
+    "Go developer building gRPC microservices, Kafka consumers and Redis caching layers",
+    "Full stack developer, Node.js, Express, MongoDB and Vue, freelance projects for startups",
+    "Embedded software engineer, C and C++ on ARM Cortex-M, RTOS, CAN bus and bootloaders",
+    "Security engineer, penetration testing, OWASP, threat modelling and SIEM rule development",
+    "Data engineer, Airflow pipelines, dbt models and Snowflake warehouse cost optimisation",
+    "Java developer with Spring Boot, Hibernate and Oracle for insurance claims processing",
+    "QA automation engineer, Selenium, Cypress and Playwright suites in CI with GitHub Actions",
+    "Site reliability engineer, incident response, SLOs, Linux performance and eBPF tracing",
+    "Product designer with Figma prototyping, user research and accessibility audits",
+    "Rust systems programmer, async runtimes, zero-copy parsers and WebAssembly modules",
+    "Business analyst, SQL reporting, Tableau dashboards and stakeholder requirement workshops",
+    "Cloud architect, AWS Lambda, DynamoDB, event-driven design and multi-account landing zones",
+    "Computer vision researcher, OpenCV, object detection with YOLO and edge deployment on Jetson",
+]
+
+QUERIES = [
+    "python backend developer with postgres",
+    "react frontend engineer",
+    "kubernetes and terraform devops",
+    "mobile developer for android apps",
+    "deep learning with pytorch",
+    "data pipelines with airflow and snowflake",
+    "low level c++ embedded firmware",
+    "security and penetration testing",
+]
+
+
+def encode(model, texts):
+    return np.asarray(model.encode(texts, batch_size=settings.EMBEDDING_BATCH_SIZE, normalize_embeddings=True))
+
+
+def top_k(query_vectors, resume_vectors, k: int = 5):
+    return [set(np.argsort(-scores)[:k]) for scores in query_vectors @ resume_vectors.T]
+
+
+def benchmark(model, rounds: int, batch_texts):
+    encode(model, QUERIES[:1])  # warm-up, the first call pays for graph and session setup
+    latencies = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        encode(model, [QUERIES[i % len(QUERIES)]])
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    encode(model, batch_texts)
+    throughput = len(batch_texts) / (time.perf_counter() - start)
+    return statistics.median(latencies) * 1000, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--rounds", type=int, default=50, help="single-query encodes for the latency median")
+    parser.add_argument("--batch", type=int, default=512, help="texts encoded for the throughput figure")
+    args = parser.parse_args()
+
+    batch_texts = (RESUMES * (args.batch // len(RESUMES) + 1))[:args.batch]
+    reference = load_embedding_model(args.model, "torch")
+    ref_resumes, ref_queries = encode(reference, RESUMES), encode(reference, QUERIES)
+    ref_top = top_k(ref_queries, ref_resumes)
+
+    print(f"model {args.model}, {len(RESUMES)} resumes, {len(QUERIES)} queries")
+    print(f"{'backend':<10} {'mean cos':>9} {'min cos':>9} {'top5 overlap':>13} {'p50 ms':>8} {'texts/s':>9}")
+    for backend in args.backends:
+        try:
+            model = reference if backend == "torch" else load_embedding_model(args.model, backend)
+        except Exception as e:
+            print(f"{backend:<10} failed to load: {e}")
+            continue
+        resumes, queries = encode(model, RESUMES), encode(model, QUERIES)
+        cosines = np.concatenate([(resumes * ref_resumes).sum(axis=1), (queries * ref_queries).sum(axis=1)])
+        overlap = np.mean([len(a & b) / len(a) for a, b in zip(top_k(queries, resumes), ref_top)])
+        latency_ms, throughput = benchmark(model, args.rounds, batch_texts)
+        print(
+            f"{backend:<10} {cosines.mean():>9.4f} {cosines.min():>9.4f} {overlap:>13.2f} "
+            f"{latency_ms:>8.2f} {throughput:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+import numpy as np
+from sqlalchemy import event
+from app.core.database import SessionLocal, engine
+from app.models.resume import Resume
+from app.models.user import User, UserRole
+from app.schemas.resume import ParsedResume
+from app.services.resume_service import ResumeService, resume_cache, save_parsed_resumes
+
+
+def test_resume_detail_loads_in_two_queries():
+    parsed = ParsedResume(
+        name="Query Count",
+        experiences=[
+            {"title": f"Job {i}", "summary": "s", "start_date": "a", "end_date": "b", "organization": "o"} for i in range(3)
+        ],
+        educations=[
+            {"title": f"Degree {i}", "start_date": "a", "end_date": "b", "organization": "o", "grade": "", "percentage": ""}
+            for i in range(2)
+        ],
+        projects=[
+            {"title": f"Project {i}", "summary": "s", "start_date": "a", "end_date": "b",
+             "technologies": ["Docker"], "programming_languages": ["Go"]}
+            for i in range(4)
+        ],
+        certifications=[{"title": f"Cert {i}", "organization": "o", "end_date": "b"} for i in range(2)],
+    )
+    resume_id = None
+    db = SessionLocal()
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        user_id = db.query(User.id).first()[0]
+        resume_id = save_parsed_resumes(db, [(user_id, parsed, np.ones(384, dtype=np.float32))])[0]
+        resume_cache.invalidate(resume_id)
+        db.close()
+        db = SessionLocal()
+        hr = SimpleNamespace(id=0, role=UserRole.hr)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            (etag, resume), error = ResumeService.get_cached_resume(db, resume_id, hr)
+            cold = len(statements)
+            statements.clear()
+            (cached_etag, _), _ = ResumeService.get_cached_resume(db, resume_id, hr)
+            warm = len(statements)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert error is None
+        assert cold == 2
+        assert warm == 0
+        assert cached_etag == etag
+        assert sorted(e["title"] for e in resume["experience"]) == ["Job 0", "Job 1", "Job 2"]
+        assert len(resume["education"]) == 2
+        assert len(resume["projects"]) == 4
+        assert len(resume["certifications"]) == 2
+    finally:
+        db.rollback()
+        if resume_id is not None:
+            db.delete(db.get(Resume, resume_id))
+            db.commit()
+            resume_cache.invalidate(resume_id)
+        db.close()
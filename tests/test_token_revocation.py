@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import TokenBlacklist
+from app.services.auth_service import TokenRevocationCache
+
+
+def test_refresh_purges_expired_rows_including_legacy():
+    now = datetime.now(timezone.utc)
+    lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    rows = {
+        "legacy_old": TokenBlacklist(token=uuid4().hex, created_at=now - lifetime - timedelta(minutes=1)),
+        "legacy_live": TokenBlacklist(token=uuid4().hex, created_at=now - timedelta(minutes=1)),
+        "expired": TokenBlacklist(jti=uuid4().hex, expires_at=now - timedelta(minutes=1)),
+        "live": TokenBlacklist(jti=uuid4().hex, expires_at=now + timedelta(minutes=1)),
+    }
+    ids = {}
+    db = SessionLocal()
+    try:
+        db.add_all(rows.values())
+        db.commit()
+        ids = {name: row.id for name, row in rows.items()}
+        tokens = {name: row.token for name, row in rows.items()}
+
+        cache = TokenRevocationCache(refresh_seconds=0, purge_seconds=0)
+        cache.refresh(db)
+
+        remaining = {row_id for (row_id,) in db.query(TokenBlacklist.id).filter(TokenBlacklist.id.in_(ids.values()))}
+        assert remaining == {ids["legacy_live"], ids["live"]}
+        assert cache.is_revoked(db, tokens["legacy_live"])
+        assert not cache.is_revoked(db, tokens["legacy_old"])
+    finally:
+        db.query(TokenBlacklist).filter(TokenBlacklist.id.in_(ids.values())).delete()
+        db.commit()
+        db.close()